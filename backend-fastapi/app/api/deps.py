@@ -3,6 +3,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
+from app.core.principal_cache import principals
 from app.core import security
 from app.core.config import settings
 from app.models.users import User
@@ -13,6 +14,9 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 async def get_current_user(token: str = Depends(reusable_oauth2)) -> User:
+    cached = principals.get(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -26,6 +30,7 @@ async def get_current_user(token: str = Depends(reusable_oauth2)) -> User:
     user = await User.get(token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    principals.put(token, user, payload.get("exp"))
     return user
 
 async def get_current_active_user(
@@ -0,0 +1,85 @@
+"""
+Conditional GET helpers (ETag / If-None-Match, Last-Modified / If-Modified-Since).
+
+Two kinds of ETag are used: ``etag_for`` hashes a computed payload, and
+``version_etag`` hashes version counters (``app.services.versions``) so an
+unchanged resource is recognised before it is loaded at all.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+from app.api.responses import wants_ndjson
+from app.services.versions import current
+
+
+def etag_for(payload: Any) -> str:
+    """Weak ETag over the JSON form of a response payload."""
+    body = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return f'W/"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+
+
+def version_etag(*parts: Any) -> str:
+    """Weak ETag over version counters and whatever else selects the response."""
+    key = "|".join(str(p) for p in parts)
+    return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:24]}"'
+
+
+def _if_modified_since(request: Request) -> Optional[datetime]:
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return None
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return None
+    return since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    header = request.headers.get("if-none-match")
+    if header:
+        candidates = {tag.strip() for tag in header.split(",")}
+        return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+    # If-Modified-Since only counts when no ETag was sent
+    since = _if_modified_since(request)
+    if since is None or last_modified is None:
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+def _cache_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    return Response(status_code=304, headers=_cache_headers(etag, last_modified))
+
+
+def set_etag(response: Response, etag: str, last_modified: Optional[datetime] = None) -> None:
+    response.headers.update(_cache_headers(etag, last_modified))
+
+
+async def check_collections(request: Request, response: Response, *collections: str) -> Optional[Response]:
+    """
+    Conditional GET for a response built from ``collections``: a 304 when the
+    client's copy is current, otherwise None after putting ETag and
+    Last-Modified on ``response``. The query string and the representation
+    (JSON or NDJSON) are part of the ETag, so each is cached separately.
+    """
+    versions, changed_at = await current(collections)
+    etag = version_etag(
+        request.url.path, request.url.query, wants_ndjson(request), *sorted(versions.items())
+    )
+    if is_not_modified(request, etag, changed_at):
+        return not_modified(etag, changed_at)
+    set_etag(response, etag, changed_at)
+    return None
@@ -0,0 +1,126 @@
+"""
+Shared plumbing for the bulk-import endpoints.
+
+Uploads are .xlsx or .csv files whose first row names the columns. Rows are
+streamed one at a time (``iter_rows``), processed in batches (``chunked``)
+and written with unordered ``insert_many`` (``insert_rows``), so one bad row
+is reported without stopping the others.
+"""
+
+import csv
+import io
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from beanie import Document
+from fastapi import HTTPException, UploadFile
+from openpyxl import load_workbook
+from pymongo.errors import BulkWriteError
+
+MAX_IMPORT_BYTES = 5 * 1024 * 1024
+IMPORT_BATCH_SIZE = 1000  # rows validated and inserted together
+
+
+async def read_upload(file: UploadFile) -> Tuple[bytes, str]:
+    """Read an uploaded sheet, checking its type and size. Returns (bytes, kind)."""
+    name = (file.filename or "").lower()
+    if name.endswith((".xlsx", ".xls")):
+        kind = "xlsx"
+    elif name.endswith(".csv"):
+        kind = "csv"
+    else:
+        raise HTTPException(status_code=400, detail="Only .xlsx, .xls or .csv files are accepted.")
+    contents = await file.read()
+    if len(contents) > MAX_IMPORT_BYTES:
+        raise HTTPException(status_code=400, detail="File too large. Max 5 MB.")
+    return contents, kind
+
+
+def _raw_rows(contents: bytes, kind: str) -> Iterator[Sequence]:
+    if kind == "csv":
+        yield from csv.reader(io.TextIOWrapper(io.BytesIO(contents), encoding="utf-8-sig", newline=""))
+        return
+    workbook = load_workbook(filename=io.BytesIO(contents), read_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_rows(
+    contents: bytes,
+    kind: str,
+    required: List[str],
+    optional: Iterable[str] = (),
+) -> Iterator[Dict[str, str]]:
+    """
+    Yield each non-empty data row as {column: stripped string} plus ``_row``
+    (the 1-based sheet row). Headers are matched case-insensitively and in
+    any order; every ``required`` column must be present.
+    """
+    rows = _raw_rows(contents, kind)
+    headers = next(rows, None)
+    if headers is None:
+        raise HTTPException(status_code=400, detail="File is empty.")
+    names = [str(h).strip().lower() if h is not None else "" for h in headers]
+    missing = [c for c in required if c not in names]
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing columns: {missing}. Expected: {required + list(optional)}. "
+                   f"Got: {[n for n in names if n]}",
+        )
+    wanted = set(required) | set(optional)
+    columns = [(i, n) for i, n in enumerate(names) if n in wanted]
+
+    for row_num, row in enumerate(rows, start=2):
+        if all(cell is None or str(cell).strip() == "" for cell in row):
+            continue
+        record = {
+            name: (str(row[i]).strip() if i < len(row) and row[i] is not None else "")
+            for i, name in columns
+        }
+        record["_row"] = row_num
+        yield record
+
+
+def chunked(items: Iterable, size: int = IMPORT_BATCH_SIZE) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def split_list(value: str) -> List[str]:
+    """Cell holding several values, separated by ``;`` or ``,``."""
+    return [v.strip() for v in value.replace(";", ",").split(",") if v.strip()]
+
+
+def error_messages(exc: Exception) -> List[str]:
+    """Readable messages for a pydantic ValidationError (or any exception)."""
+    errors = getattr(exc, "errors", None)
+    if callable(errors):
+        return [f"{'.'.join(str(p) for p in e.get('loc', ())) or 'row'}: {e.get('msg')}" for e in errors()]
+    return [str(exc)]
+
+
+async def insert_rows(model: type[Document], docs: List[Document], rows: List[int]) -> Tuple[List[int], List[dict]]:
+    """
+    Insert documents (ids pre-assigned) unordered. Returns the indexes that
+    were written and an error entry per failed row.
+    """
+    failed: Dict[int, str] = {}
+    if docs:
+        try:
+            await model.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                failed[err["index"]] = (
+                    "duplicate key" if err.get("code") == 11000 else err.get("errmsg", "insert failed")
+                )
+    written = [i for i in range(len(docs)) if i not in failed]
+    errors = [{"row": rows[i], "errors": [msg]} for i, msg in failed.items()]
+    return written, errors
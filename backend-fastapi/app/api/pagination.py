@@ -0,0 +1,39 @@
+"""
+Keyset pagination for list endpoints.
+
+Pages are ordered by ``_id``; the last id of a page is returned in the
+``X-Next-Cursor`` header and passed back as ``cursor`` to get the next one.
+Unlike ``skip``, each page costs one index range scan however deep it is.
+"""
+
+from typing import List, Optional
+
+from beanie import Document, PydanticObjectId
+from fastapi import Response
+
+MAX_PAGE_SIZE = 500
+
+
+async def keyset_page(
+    model: type[Document],
+    query: dict,
+    response: Response,
+    cursor: Optional[PydanticObjectId] = None,
+    limit: int = 100,
+    with_total: bool = False,
+) -> List[Document]:
+    """
+    One page of ``model`` documents matching ``query``. Sets ``X-Next-Cursor``
+    when more remain and, with ``with_total``, ``X-Total-Count`` (all matches,
+    not just those after the cursor).
+    """
+    if with_total:
+        response.headers["X-Total-Count"] = str(await model.find(query).count())
+    page_query = dict(query)
+    if cursor is not None:
+        page_query["_id"] = {"$gt": cursor}
+    docs = await model.find(page_query).sort("+_id").limit(limit + 1).to_list()
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers["X-Next-Cursor"] = str(docs[-1].id)
+    return docs
@@ -0,0 +1,74 @@
+"""
+Fast JSON output for large responses.
+
+The ``_xxx_out`` helpers already build plain dicts in the shape of their
+response models. Returning them through ``json_response`` encodes them once,
+with orjson when it is installed, and skips FastAPI's second pass that
+re-validates the result against ``response_model`` before encoding it. The
+response model stays on the route for the OpenAPI schema.
+
+List endpoints also stream NDJSON (one JSON document per line) to clients
+that send ``Accept: application/x-ndjson``.
+"""
+
+import json
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+NDJSON = "application/x-ndjson"
+
+# Headers of the injected ``Response`` that describe its own (empty) body
+_BODY_HEADERS = {"content-length", "content-type"}
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _headers(response: Optional[Response]) -> dict:
+    # Headers set on the injected Response (X-Next-Cursor, ETag...) are not
+    # applied by FastAPI when the endpoint returns its own Response.
+    if response is None:
+        return {}
+    return {k: v for k, v in response.headers.items() if k not in _BODY_HEADERS}
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """Already-shaped ``content`` as JSON, keeping the headers set on ``response``."""
+    return FastJSONResponse(content, headers=_headers(response))
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
+
+
+def ndjson_response(items: Iterable[Any], response: Optional[Response] = None) -> StreamingResponse:
+    """Stream ``items`` as NDJSON, encoding each one as it is sent."""
+    return StreamingResponse(
+        (dumps(item) + b"\n" for item in items),
+        media_type=NDJSON,
+        headers=_headers(response),
+    )
+
+
+def list_response(request: Request, items: Iterable[Any], response: Optional[Response] = None) -> Response:
+    """NDJSON when the client asks for it, a JSON array otherwise."""
+    if wants_ndjson(request):
+        return ndjson_response(items, response)
+    return json_response(list(items), response)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import login, users, programs, courses, faculty, infrastructure, timetables, generator, ai, user_management
+from app.api.v1.endpoints import login, users, programs, courses, faculty, infrastructure, timetables, generator, ai, user_management, system, search
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
@@ -12,3 +12,5 @@ api_router.include_router(infrastructure.router, prefix="/infrastructure", tags=
 api_router.include_router(timetables.router, prefix="/timetables", tags=["timetables"])
 api_router.include_router(generator.router, prefix="/generator", tags=["generator"])
 api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
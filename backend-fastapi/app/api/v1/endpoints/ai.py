@@ -16,11 +16,10 @@ from pydantic import BaseModel
 from app.api import deps
 from app.core.config import settings
 from app.models.users import User
-from app.models.faculty import Faculty
 from app.models.courses import Course
-from app.models.infrastructure import Room
-from app.models.programs import Program, Batch, Semester, Section
 from app.models.timetable import Timetable
+from app.services.refdata import reference_data
+from app.services.resolver import TimetableRefs, extract_link_id, resolve_timetable_refs
 
 router = APIRouter()
 
@@ -98,7 +97,7 @@ async def _build_timetable_context(timetable_id: Optional[str] = None) -> str:
     parts: List[str] = []
 
     # Faculty summary
-    faculty = await Faculty.find_all().to_list()
+    faculty = await reference_data.faculty.all()
     if faculty:
         fac_lines = []
         for f in faculty:
@@ -116,13 +115,13 @@ async def _build_timetable_context(timetable_id: Optional[str] = None) -> str:
         parts.append("COURSES:\n" + "\n".join(course_lines))
 
     # Rooms summary
-    rooms = await Room.find_all().to_list()
+    rooms = await reference_data.rooms.all()
     if rooms:
         room_lines = [f"  - {r.name} (type: {r.type or 'General'}, capacity: {r.capacity})" for r in rooms]
         parts.append("ROOMS:\n" + "\n".join(room_lines))
 
     # Programs/Batches
-    programs = await Program.find_all().to_list()
+    programs = await reference_data.programs.all()
     if programs:
         prog_lines = []
         for p in programs:
@@ -140,9 +139,10 @@ async def _build_timetable_context(timetable_id: Optional[str] = None) -> str:
             _append_timetable_entries(parts, tt, label)
             all_timetables.append((tt, label))
     else:
-        timetables = await Timetable.find_all().to_list()
-        for tt in timetables[:5]:  # up to 5
-            label = await _timetable_label(tt)
+        timetables = await Timetable.find_all().limit(5).to_list()  # up to 5
+        refs = await resolve_timetable_refs(timetables)
+        for tt in timetables:
+            label = await _timetable_label(tt, refs)
             _append_timetable_entries(parts, tt, label)
             all_timetables.append((tt, label))
 
@@ -155,45 +155,20 @@ async def _build_timetable_context(timetable_id: Optional[str] = None) -> str:
     return "\n\n".join(parts)
 
 
-def _extract_link_id(link_field):
-    """Extract the string ID from a Beanie Link or document."""
-    if link_field is None:
-        return None
-    if hasattr(link_field, "id"):
-        return str(link_field.id)
-    if hasattr(link_field, "ref") and link_field.ref:
-        return str(link_field.ref.id)
-    return None
-
-
-async def _timetable_label(tt: Timetable) -> str:
+async def _timetable_label(tt: Timetable, refs: TimetableRefs | None = None) -> str:
     """Build a human-readable label like 'B.Tech CSE – Sem 3 – Section A' for a timetable."""
-    from beanie.odm.fields import PydanticObjectId
+    if refs is None:
+        refs = await resolve_timetable_refs([tt])
     label_parts = []
-    try:
-        pid = _extract_link_id(tt.program)
-        if pid:
-            prog = await Program.get(PydanticObjectId(pid))
-            if prog:
-                label_parts.append(prog.name)
-    except Exception:
-        pass
-    try:
-        sid = _extract_link_id(tt.semester)
-        if sid:
-            sem = await Semester.get(PydanticObjectId(sid))
-            if sem:
-                label_parts.append(f"Sem {sem.number}" if hasattr(sem, "number") and sem.number else sem.name)
-    except Exception:
-        pass
-    try:
-        sec_id = _extract_link_id(tt.section)
-        if sec_id:
-            sec = await Section.get(PydanticObjectId(sec_id))
-            if sec:
-                label_parts.append(f"Section {sec.name}")
-    except Exception:
-        pass
+    program_name = refs.program_name(extract_link_id(tt.program))
+    if program_name:
+        label_parts.append(program_name)
+    sem = refs.semester(extract_link_id(tt.semester))
+    if sem:
+        label_parts.append(f"Sem {sem.number}" if sem.number else sem.name)
+    section_name = refs.section_name(extract_link_id(tt.section))
+    if section_name:
+        label_parts.append(f"Section {section_name}")
     return " – ".join(label_parts) if label_parts else f"Timetable {tt.id}"
 
 
@@ -375,9 +350,9 @@ async def ai_dashboard_insights(
     context = await _build_timetable_context()
 
     # Also gather some stats
-    faculty = await Faculty.find_all().to_list()
+    faculty = await reference_data.faculty.all()
     courses = await Course.find_all().to_list()
-    rooms = await Room.find_all().to_list()
+    rooms = await reference_data.rooms.all()
     timetables = await Timetable.find_all().to_list()
 
     # Quick data checks
@@ -1,27 +1,26 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
 from beanie.odm.fields import PydanticObjectId
+from beanie.operators import In
+from pydantic import BaseModel, ValidationError
 from app.api import deps
-from app.models.courses import Course
+from app.api.etag import check_collections, is_not_modified, not_modified, set_etag, version_etag
+from app.api.imports import chunked, error_messages, insert_rows, iter_rows, read_upload, split_list
+from app.api.pagination import MAX_PAGE_SIZE, keyset_page
+from app.api.responses import list_response
+from app.models.courses import CODE_COLLATION, Course, CourseComponent
 from app.models.programs import Program, Semester
 from app.models.users import User
+from app.models.versioned import VersionView
 from app.schemas.courses import CourseCreate, CourseOut
+from app.schemas.imports import BulkImportResponse
+from app.services.refdata import reference_data
+from app.services.resolver import extract_link_id
+from app.services.versions import record_write
 
 router = APIRouter()
 
 
-def _extract_link_id(link_field) -> str | None:
-    if link_field is None:
-        return None
-    # If it's a fetched Document, use .id
-    if hasattr(link_field, "id"):
-        return str(link_field.id)
-    # If it's an unfetched Link with .ref
-    if hasattr(link_field, "ref") and link_field.ref:
-        return str(link_field.ref.id)
-    return None
-
-
 def _course_out(c: Course) -> dict:
     return {
         "id": str(c.id),
@@ -30,9 +29,10 @@ def _course_out(c: Course) -> dict:
         "credits": c.credits,
         "type": c.type,
         "components": c.components.model_dump() if c.components else {"lecture": 0, "tutorial": 0, "practical": 0},
-        "program_id": _extract_link_id(c.program),
-        "semester_id": _extract_link_id(c.semester),
+        "program_id": extract_link_id(c.program),
+        "semester_id": extract_link_id(c.semester),
         "is_elective": c.is_elective,
+        "required_features": c.required_features or [],
     }
 
 
@@ -55,24 +55,169 @@ async def create_course(
             raise HTTPException(status_code=404, detail="Semester not found")
         course.semester = sem  # type: ignore
     await course.insert()
+    await record_write("courses")
     return _course_out(course)
 
 
+class _CourseKey(BaseModel):
+    code: str
+    program: Any = None
+
+
+COURSE_IMPORT_COLUMNS = ["code", "name", "credits", "type"]
+COURSE_IMPORT_OPTIONAL = [
+    "lecture", "tutorial", "practical", "program", "semester", "is_elective", "required_features",
+]
+
+
+@router.post("/import", response_model=BulkImportResponse)
+async def import_courses(
+    file: UploadFile = File(...),
+    current_user: User = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Create courses from an .xlsx/.csv sheet with columns code, name, credits,
+    type and optionally lecture, tutorial, practical, program (id or code),
+    semester (id or number), is_elective (yes/no) and required_features
+    (``;``-separated). Rows are validated first; valid ones are inserted in
+    batches and every rejected row is reported.
+    """
+    contents, kind = await read_upload(file)
+
+    programs = {}
+    for p in await reference_data.programs.all():
+        programs[str(p.id)] = p
+        programs[p.code.lower()] = p
+    semesters = {}
+    for sem in await reference_data.semesters.all():
+        semesters[str(sem.id)] = sem
+        semesters[str(sem.number)] = sem
+
+    total_records = 0
+    seen = set()
+    created, error_list = [], []
+    for records in chunked(iter_rows(contents, kind, COURSE_IMPORT_COLUMNS, COURSE_IMPORT_OPTIONAL)):
+        total_records += len(records)
+
+        # (code, program id) pairs already in the database, for this batch's codes
+        # only; codes are matched ignoring case (code_ci index), as within the sheet
+        codes = list({r["code"] for r in records if r.get("code")})
+        existing = {
+            (c.code.lower(), extract_link_id(c.program) or "")
+            for c in await Course.find(In(Course.code, codes), collation=CODE_COLLATION).project(_CourseKey).to_list()
+        }
+
+        docs, rows = [], []
+        for record in records:
+            row_num = record.pop("_row")
+            errors = []
+            program = semester = None
+            if record.get("program"):
+                program = programs.get(record["program"].lower()) or programs.get(record["program"])
+                if not program:
+                    errors.append(f"program '{record['program']}' not found")
+            if record.get("semester"):
+                semester = semesters.get(record["semester"])
+                if not semester:
+                    errors.append(f"semester '{record['semester']}' not found")
+            try:
+                course_in = CourseCreate(
+                    code=record["code"],
+                    name=record["name"],
+                    credits=record["credits"],
+                    type=record["type"],
+                    components=CourseComponent(
+                        lecture=record.get("lecture") or 0,
+                        tutorial=record.get("tutorial") or 0,
+                        practical=record.get("practical") or 0,
+                    ),
+                    is_elective=record.get("is_elective", "").lower() in ("1", "true", "yes", "y"),
+                    required_features=split_list(record.get("required_features", "")),
+                )
+            except ValidationError as e:
+                errors += error_messages(e)
+                course_in = None
+
+            key = (record["code"].lower(), str(program.id) if program else "")
+            if course_in and (key in existing or key in seen):
+                errors.append(f"course '{record['code']}' already exists" + (f" in program {program.code}" if program else ""))
+            if errors:
+                error_list.append({"row": row_num, "errors": errors})
+                continue
+
+            seen.add(key)
+            course = Course(id=PydanticObjectId(), **course_in.model_dump(exclude={"program_id", "semester_id"}))
+            course.program = program  # type: ignore
+            course.semester = semester  # type: ignore
+            docs.append(course)
+            rows.append(row_num)
+
+        written, insert_errors = await insert_rows(Course, docs, rows)
+        error_list += insert_errors
+        created += [{"row": rows[i], "id": str(docs[i].id), "code": docs[i].code} for i in written]
+
+    if not total_records:
+        raise HTTPException(status_code=400, detail="No data rows found in the file.")
+    if created:
+        await record_write("courses")
+    return BulkImportResponse(
+        total_records=total_records,
+        successfully_created=len(created),
+        failed=len(error_list),
+        errors=sorted(error_list, key=lambda e: e["row"]),
+        created=created,
+    )
+
+
 @router.get("/", response_model=List[CourseOut])
 async def read_courses(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    program_id: Optional[PydanticObjectId] = None,
+    semester_id: Optional[PydanticObjectId] = None,
+    type: Optional[str] = None,
+    is_elective: Optional[bool] = None,
+    cursor: Optional[PydanticObjectId] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    with_total: bool = False,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    courses = await Course.find_all().skip(skip).limit(limit).to_list()
-    return [_course_out(c) for c in courses]
+    """
+    List courses matching the filters, in ``_id`` order. Pass the
+    ``X-Next-Cursor`` response header back as ``cursor`` for the next page;
+    ``with_total=true`` adds the match count as ``X-Total-Count``.
+    Send ``Accept: application/x-ndjson`` to stream one course per line.
+    """
+    not_changed = await check_collections(request, response, "courses")
+    if not_changed:
+        return not_changed
+    query: dict = {}
+    for key, value in (
+        ("program.$id", program_id),
+        ("semester.$id", semester_id),
+        ("type", type),
+        ("is_elective", is_elective),
+    ):
+        if value is not None:
+            query[key] = value
+    courses = await keyset_page(Course, query, response, cursor, limit, with_total)
+    return list_response(request, (_course_out(c) for c in courses), response)
 
 
 @router.get("/{course_id}", response_model=CourseOut)
 async def read_course(
-    course_id: str,
+    course_id: PydanticObjectId,
+    request: Request,
+    response: Response,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
+    view = await Course.find_one({"_id": course_id}).project(VersionView)
+    if not view:
+        raise HTTPException(status_code=404, detail="Course not found")
+    etag = version_etag("course", course_id, view.version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     course = await Course.get(course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -88,4 +233,5 @@ async def delete_course(
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     await course.delete()
+    await record_write("courses")
     return {"detail": "Course deleted"}
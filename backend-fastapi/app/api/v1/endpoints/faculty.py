@@ -1,14 +1,26 @@
-from typing import List, Any
+from typing import List, Any, Optional
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
+from beanie import Link
 from beanie.odm.fields import PydanticObjectId
+from beanie.operators import In, Or
+from bson import DBRef
+from pydantic import BaseModel, Field, ValidationError
 from app.api import deps
+from app.api.etag import check_collections, etag_for, is_not_modified, not_modified, set_etag
+from app.api.imports import chunked, error_messages, insert_rows, iter_rows, read_upload, split_list
+from app.api.pagination import MAX_PAGE_SIZE, keyset_page
+from app.api.responses import list_response
 from app.core import security
+from app.core.principal_cache import principals
 from app.models.faculty import Faculty
-from app.models.users import User
-from app.models.courses import Course
-from app.models.timetable import Timetable, TimetableEntry
+from app.models.users import EMAIL_COLLATION, User
+from app.models.courses import CODE_COLLATION, Course
+from app.models.timetable import TimetableEntry
 from app.schemas.faculty import FacultyCreate, FacultyOut
+from app.schemas.imports import BulkImportResponse
+from app.services.schedules import faculty_schedule
+from app.services.versions import record_write
 
 router = APIRouter()
 
@@ -50,60 +62,236 @@ async def create_faculty(
                 courses.append(course)
         faculty.can_teach = courses
 
-    await faculty.insert()
-
-    # ── Auto-create user account for faculty login ──
+    # ── Login account for the faculty member ──
+    # Hashed before anything is written: hashing can be refused with a 503,
+    # and the client's retry must not leave a faculty without a login or a
+    # second faculty document.
     default_password = None
+    user = None
     existing_user = await User.find_one(User.email == faculty_in.email)
     if not existing_user:
         # Generate default password: email prefix + @123
         default_password = faculty_in.email.split("@")[0] + "@123"
         user = User(
             email=faculty_in.email,
-            hashed_password=security.get_password_hash(default_password),
+            hashed_password=await security.get_password_hash_async(default_password),
             full_name=faculty_in.name,
             role="faculty",
         )
+
+    await faculty.insert()
+    await record_write("faculty")
+
+    if user is not None:
         await user.insert()
         logging.info(f"Auto-created user account for faculty: {faculty_in.email}")
-    else:
+    elif existing_user.role != "faculty":
         # If user exists but isn't faculty role, update role
-        if existing_user.role != "faculty":
-            existing_user.role = "faculty"
-            await existing_user.save()
-            logging.info(f"Updated existing user role to faculty: {faculty_in.email}")
+        existing_user.role = "faculty"
+        await existing_user.save()
+        principals.invalidate_user(existing_user.id)
+        logging.info(f"Updated existing user role to faculty: {faculty_in.email}")
 
     return _faculty_out(faculty, default_password=default_password)
 
 
+class _CourseKey(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    code: str
+
+
+class _UserKey(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    email: str
+    role: str = ""
+
+
+class _EmailKey(BaseModel):
+    email: str
+
+
+def _parse_busy_slots(value: str) -> list:
+    """``Monday:1,2; Tuesday:3`` -> [{"day": "Monday", "periods": [1, 2]}, ...]"""
+    slots = []
+    for part in value.split(";"):
+        if not part.strip():
+            continue
+        day, _, periods = part.partition(":")
+        slots.append({"day": day.strip(), "periods": [int(p) for p in split_list(periods)]})
+    return slots
+
+
+FACULTY_IMPORT_COLUMNS = ["name", "email", "department", "designation"]
+FACULTY_IMPORT_OPTIONAL = ["max_load_hours", "can_teach", "busy_slots"]
+
+
+@router.post("/import", response_model=BulkImportResponse)
+async def import_faculty(
+    file: UploadFile = File(...),
+    current_user: User = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Create faculty from an .xlsx/.csv sheet with columns name, email,
+    department, designation and optionally max_load_hours, can_teach (course
+    codes or ids, ``;``-separated) and busy_slots (``Monday:1,2; Tuesday:3``).
+    As with single creates, a faculty login is made for each new email
+    (default password returned per row) and existing users become faculty.
+    """
+    contents, kind = await read_upload(file)
+
+    total_records = 0
+    seen = set()
+    created, error_list = [], []
+    for records in chunked(iter_rows(contents, kind, FACULTY_IMPORT_COLUMNS, FACULTY_IMPORT_OPTIONAL)):
+        total_records += len(records)
+
+        # Batched lookups: referenced courses, existing faculty and user accounts
+        tokens = {t for r in records for t in split_list(r.get("can_teach", ""))}
+        oids = [PydanticObjectId(t) for t in tokens if PydanticObjectId.is_valid(t)]
+        course_ids = {}
+        if tokens:
+            # Codes matched ignoring case (code_ci index)
+            for c in await Course.find(
+                Or(In(Course.code, list(tokens)), In(Course.id, oids)), collation=CODE_COLLATION
+            ).project(_CourseKey).to_list():
+                course_ids.setdefault(c.code.lower(), []).append(c.id)
+                course_ids[str(c.id)] = [c.id]
+        # Matched ignoring case (email_ci indexes)
+        emails = list({r["email"] for r in records if r.get("email")})
+        existing = {
+            f.email.lower()
+            for f in await Faculty.find(In(Faculty.email, emails), collation=EMAIL_COLLATION).project(_EmailKey).to_list()
+        }
+        users = {
+            u.email.lower(): u
+            for u in await User.find(In(User.email, emails), collation=EMAIL_COLLATION).project(_UserKey).to_list()
+        }
+
+        docs, rows = [], []
+        for record in records:
+            row_num = record.pop("_row")
+            errors = []
+            can_teach = []
+            for token in split_list(record.get("can_teach", "")):
+                ids = course_ids.get(token.lower()) or course_ids.get(token)
+                if not ids:
+                    errors.append(f"course '{token}' not found")
+                can_teach += [Link(DBRef("courses", cid), Course) for cid in ids or []]
+            try:
+                faculty_in = FacultyCreate(
+                    name=record["name"],
+                    email=record["email"],
+                    department=record["department"],
+                    designation=record["designation"],
+                    max_load_hours=record.get("max_load_hours") or 18,
+                    busy_slots=_parse_busy_slots(record.get("busy_slots", "")),
+                )
+            except (ValidationError, ValueError) as e:
+                errors += error_messages(e)
+                faculty_in = None
+            if faculty_in:
+                key = faculty_in.email.lower()
+                if key in existing or key in seen:
+                    errors.append(f"faculty with email '{faculty_in.email}' already exists")
+            if errors:
+                error_list.append({"row": row_num, "errors": errors})
+                continue
+
+            seen.add(key)
+            faculty = Faculty(id=PydanticObjectId(), **faculty_in.model_dump(exclude={"can_teach_course_ids"}))
+            faculty.can_teach = can_teach
+            docs.append(faculty)
+            rows.append(row_num)
+
+        written, insert_errors = await insert_rows(Faculty, docs, rows)
+        error_list += insert_errors
+        new_faculty = [docs[i] for i in written]
+
+        # ── Login accounts, as create_faculty does one at a time ──
+        account_of = [i for i in written if docs[i].email.lower() not in users]
+        new_accounts = [docs[i] for i in account_of]
+        defaults = [f.email.split("@")[0] + "@123" for f in new_accounts]
+        hashes = await security.get_password_hashes(defaults)
+        accounts = [
+            User(id=PydanticObjectId(), email=f.email, hashed_password=hashed, full_name=f.name, role="faculty")
+            for f, hashed in zip(new_accounts, hashes)
+        ]
+        written_accounts, account_errors = await insert_rows(User, accounts, [rows[i] for i in account_of])
+        # The faculty row was created; say that its login was not
+        error_list += [
+            {"row": e["row"], "errors": [f"login account not created: {msg}" for msg in e["errors"]]}
+            for e in account_errors
+        ]
+        passwords = {str(new_accounts[i].id): defaults[i] for i in written_accounts}
+        promote = [
+            users[f.email.lower()].id for f in new_faculty
+            if f.email.lower() in users and users[f.email.lower()].role != "faculty"
+        ]
+        if promote:
+            await User.find(In(User.id, promote)).update({"$set": {"role": "faculty"}})
+            for uid in promote:
+                principals.invalidate_user(uid)
+
+        created += [
+            {"row": rows[i], "id": str(docs[i].id), "email": docs[i].email,
+             **({"default_password": passwords[str(docs[i].id)]} if str(docs[i].id) in passwords else {})}
+            for i in written
+        ]
+
+    if not total_records:
+        raise HTTPException(status_code=400, detail="No data rows found in the file.")
+    if created:
+        await record_write("faculty")
+    return BulkImportResponse(
+        total_records=total_records,
+        successfully_created=len(created),
+        failed=len(error_list),
+        errors=sorted(error_list, key=lambda e: e["row"]),
+        created=created,
+    )
+
+
 @router.get("/", response_model=List[FacultyOut])
 async def read_faculty(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    department: Optional[str] = None,
+    cursor: Optional[PydanticObjectId] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    with_total: bool = False,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    all_faculty = await Faculty.find_all().skip(skip).limit(limit).to_list()
-    return [_faculty_out(f) for f in all_faculty]
+    """
+    List faculty, optionally of one department, in ``_id`` order. Paged like
+    ``GET /courses/`` (``cursor`` / ``X-Next-Cursor``, ``with_total``, NDJSON).
+    """
+    not_changed = await check_collections(request, response, "faculty")
+    if not_changed:
+        return not_changed
+    query = {"department": department} if department else {}
+    all_faculty = await keyset_page(Faculty, query, response, cursor, limit, with_total)
+    return list_response(request, (_faculty_out(f) for f in all_faculty), response)
 
 @router.get("/me/timetable", response_model=List[TimetableEntry])
 async def get_my_timetable(
+    request: Request,
+    response: Response,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve the personal timetable for the currently logged-in faculty member.
+    Supports conditional requests via ETag / If-None-Match.
     """
     faculty = await Faculty.find_one(Faculty.email == current_user.email)
     if not faculty:
         raise HTTPException(status_code=404, detail="Faculty profile not found for this user.")
 
-    my_schedule = []
-    all_timetables = await Timetable.find_all().to_list()
+    my_schedule = await faculty_schedule(str(faculty.id))
 
-    for timetable in all_timetables:
-        for entry in timetable.entries:
-            if entry.faculty_id == str(faculty.id):
-                my_schedule.append(entry)
-    
+    etag = etag_for(my_schedule)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return my_schedule
 
 
@@ -123,7 +311,9 @@ async def delete_faculty(
     user = await User.find_one(User.email == faculty.email)
     if user and user.role == "faculty":
         await user.delete()
+        principals.invalidate_user(user.id)
         logging.info(f"Deleted user account for faculty: {faculty.email}")
 
     await faculty.delete()
+    await record_write("faculty")
     return {"detail": "Faculty deleted successfully.", "id": str(id)}
@@ -4,18 +4,18 @@ from app.api import deps
 from app.models.users import User
 from app.models.timetable import Timetable, TimetableEntry
 from app.models.courses import Course
-from app.models.faculty import Faculty
-from app.models.infrastructure import Room
 from app.models.programs import Program, Batch, Semester
+from app.services.cascade import replace_timetables
 from app.services.generator import TimetableGenerator
+from app.services.refdata import reference_data
 
 router = APIRouter()
 
 async def run_generation_task(program_id: str, batch_id: str, semester_id: str, user_id: str):
     # Fetch Data
     courses = await Course.find(Course.program.id == program_id).to_list() # Mock filter
-    faculty = await Faculty.find_all().to_list()
-    rooms = await Room.find_all().to_list()
+    faculty = await reference_data.faculty.all()
+    rooms = await reference_data.rooms.all()
     
     # Batch specific logic
     batch = await Batch.get(batch_id)
@@ -52,7 +52,8 @@ async def run_generation_task(program_id: str, batch_id: str, semester_id: str,
         entries=entries,
         is_draft=False
     )
-    await timetable.insert()
+    # Same bookkeeping as POST /timetables/generate: occupancy index and faculty load
+    await replace_timetables([], [timetable])
 
 @router.post("/generate/{program_id}/{batch_id}", status_code=202)
 async def generate_timetable(
@@ -1,8 +1,19 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pydantic import BaseModel, ValidationError
 from app.api import deps
+from app.api.etag import check_collections
+from app.api.imports import chunked, error_messages, insert_rows, iter_rows, read_upload, split_list
+from app.api.pagination import MAX_PAGE_SIZE, keyset_page
+from app.api.responses import list_response
 from app.models.infrastructure import Room
 from app.models.users import User
+from app.services.occupancy import occupancy, ROOM
+from app.services.refdata import reference_data
+from app.services.versions import record_write
+from app.schemas.imports import BulkImportResponse
 from app.schemas.infrastructure import RoomCreate, RoomOut
 
 router = APIRouter()
@@ -25,17 +36,122 @@ async def create_room(
 ) -> Any:
     room = Room(**room_in.model_dump())
     await room.insert()
+    await record_write("rooms")
     return _room_out(room)
 
 
+class _RoomName(BaseModel):
+    name: str
+
+
+@router.post("/import", response_model=BulkImportResponse)
+async def import_rooms(
+    file: UploadFile = File(...),
+    current_user: User = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Create rooms from an .xlsx/.csv sheet with columns name, capacity and
+    optionally type and features (``;``-separated). Room names must be new.
+    """
+    contents, kind = await read_upload(file)
+
+    total_records = 0
+    seen = set()
+    created, error_list = [], []
+    for records in chunked(iter_rows(contents, kind, ["name", "capacity"], ["type", "features"])):
+        total_records += len(records)
+        names = {r["name"] for r in records if r.get("name")}
+        names = list(names | {n.lower() for n in names})
+        existing = {
+            r.name.lower() for r in await Room.find(In(Room.name, names)).project(_RoomName).to_list()
+        }
+
+        docs, rows = [], []
+        for record in records:
+            row_num = record.pop("_row")
+            try:
+                room_in = RoomCreate(
+                    name=record["name"],
+                    capacity=record["capacity"],
+                    type=record.get("type") or "Lecture",
+                    features=split_list(record.get("features", "")),
+                )
+            except ValidationError as e:
+                error_list.append({"row": row_num, "errors": error_messages(e)})
+                continue
+            key = room_in.name.lower()
+            if key in existing or key in seen:
+                error_list.append({"row": row_num, "errors": [f"room '{room_in.name}' already exists"]})
+                continue
+            seen.add(key)
+            docs.append(Room(id=PydanticObjectId(), **room_in.model_dump()))
+            rows.append(row_num)
+
+        written, insert_errors = await insert_rows(Room, docs, rows)
+        error_list += insert_errors
+        created += [{"row": rows[i], "id": str(docs[i].id), "name": docs[i].name} for i in written]
+
+    if not total_records:
+        raise HTTPException(status_code=400, detail="No data rows found in the file.")
+    if created:
+        await record_write("rooms")
+    return BulkImportResponse(
+        total_records=total_records,
+        successfully_created=len(created),
+        failed=len(error_list),
+        errors=sorted(error_list, key=lambda e: e["row"]),
+        created=created,
+    )
+
+
 @router.get("/", response_model=List[RoomOut])
 async def read_rooms(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    type: Optional[str] = None,
+    min_capacity: Optional[int] = Query(None, ge=0),
+    features: List[str] = Query([]),
+    cursor: Optional[PydanticObjectId] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    with_total: bool = False,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    List rooms in ``_id`` order, optionally of one type, with at least
+    ``min_capacity`` seats and every one of ``features`` (repeat the
+    parameter). Paged like ``GET /courses/`` (``cursor`` / ``X-Next-Cursor``,
+    ``with_total``, NDJSON).
+    """
+    not_changed = await check_collections(request, response, "rooms")
+    if not_changed:
+        return not_changed
+    query: dict = {}
+    if type:
+        query["type"] = type
+    if min_capacity is not None:
+        query["capacity"] = {"$gte": min_capacity}
+    if features:
+        query["features"] = {"$all": features}
+    rooms = await keyset_page(Room, query, response, cursor, limit, with_total)
+    return list_response(request, (_room_out(r) for r in rooms), response)
+
+
+@router.get("/free", response_model=List[RoomOut])
+async def read_free_rooms(
+    day: str,
+    period: int = Query(..., ge=0),
+    type: Optional[str] = None,
+    min_capacity: int = 0,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    rooms = await Room.find_all().skip(skip).limit(limit).to_list()
-    return [_room_out(r) for r in rooms]
+    """Rooms not booked by any timetable at the given day and period."""
+    rooms = sorted(await reference_data.rooms.all(), key=lambda r: r.capacity or 0)
+    return [
+        _room_out(r) for r in rooms
+        if (r.capacity or 0) >= min_capacity
+        and (not type or r.type == type)
+        and not occupancy.is_busy(ROOM, str(r.id), (day, period))
+    ]
 
 
 @router.delete("/{room_id}")
@@ -47,4 +163,5 @@ async def delete_room(
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     await room.delete()
+    await record_write("rooms")
     return {"detail": "Room deleted"}
@@ -17,7 +17,7 @@ async def login_access_token(
     OAuth2 compatible token login, get an access token for future requests
     """
     user = await User.find_one(User.email == form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    if not user or not await security.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -38,7 +38,7 @@ async def login_json(
     JSON-based login endpoint for frontend.
     """
     user = await User.find_one(User.email == login_data.email)
-    if not user or not security.verify_password(login_data.password, user.hashed_password):
+    if not user or not await security.verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
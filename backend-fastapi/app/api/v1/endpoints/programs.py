@@ -1,12 +1,23 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Dict, List, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File
+from beanie import PydanticObjectId
+from pydantic import ValidationError
 from app.api import deps
+from app.api.etag import check_collections
+from app.api.imports import chunked, error_messages, insert_rows, iter_rows, read_upload
+from app.api.responses import list_response
 from app.models.programs import Program, Batch, Semester, Section
 from app.models.users import User
 from app.schemas.programs import (
     ProgramCreate, ProgramOut, BatchCreate, BatchOut, SemesterCreate, SemesterOut,
     SectionCreate, SectionOut
 )
+from app.schemas.imports import BulkImportResponse
+from app.services.cascade import (
+    delete_batch_cascade, delete_program_cascade, delete_section_cascade, delete_semester_cascade,
+)
+from app.services.refdata import reference_data
+from app.services.versions import record_write
 
 router = APIRouter()
 
@@ -19,56 +30,64 @@ def _section_out(s: Section) -> dict:
     }
 
 
-async def _batch_out(b: Batch) -> dict:
-    sections = []
-    for link in (b.sections or []):
-        if isinstance(link, Section):
-            sections.append(_section_out(link))
-        else:
-            sec_id = None
-            if hasattr(link, "ref"):
-                sec_id = link.ref.id if hasattr(link.ref, "id") else link.ref
-            elif hasattr(link, "id"):
-                sec_id = link.id
-            if sec_id:
-                sec = await Section.get(sec_id)
-                if sec:
-                    sections.append(_section_out(sec))
+def _link_ids(links) -> List[str]:
+    ids = []
+    for link in (links or []):
+        if isinstance(link, (Batch, Section)):
+            ids.append(str(link.id))
+        elif hasattr(link, "ref"):
+            ids.append(str(link.ref.id if hasattr(link.ref, "id") else link.ref))
+        elif hasattr(link, "id"):
+            ids.append(str(link.id))
+    return ids
+
+
+def _batch_out(b: Batch, sections: Dict[str, Section]) -> dict:
+    """``sections`` must hold every section the batch links to (see ``_resolve_tree``)."""
     return {
         "id": str(b.id),
         "name": b.name,
         "start_year": b.start_year,
         "end_year": b.end_year,
         "current_semester": None,
-        "sections": sections,
+        "sections": [_section_out(sections[sid]) for sid in _link_ids(b.sections) if sid in sections],
     }
 
 
-async def _program_out(p: Program) -> dict:
-    batches = []
-    for link in (p.batches or []):
-        if isinstance(link, Batch):
-            batches.append(await _batch_out(link))
-        else:
-            batch_id = None
-            if hasattr(link, "ref"):
-                batch_id = link.ref.id if hasattr(link.ref, "id") else link.ref
-            elif hasattr(link, "id"):
-                batch_id = link.id
-            if batch_id:
-                batch = await Batch.get(batch_id)
-                if batch:
-                    batches.append(await _batch_out(batch))
+def _program_out(p: Program, batches: Dict[str, Batch], sections: Dict[str, Section]) -> dict:
     return {
         "id": str(p.id),
         "name": p.name,
         "code": p.code,
         "type": p.type,
         "duration_years": p.duration_years,
-        "batches": batches,
+        "batches": [_batch_out(batches[bid], sections) for bid in _link_ids(p.batches) if bid in batches],
     }
 
 
+async def _resolve_tree(programs: List[Program]) -> Tuple[Dict[str, Batch], Dict[str, Section]]:
+    """Every batch and section under ``programs``: one cache lookup (at most one $in) per level."""
+    batches = await reference_data.batches.get_many(bid for p in programs for bid in _link_ids(p.batches))
+    sections = await reference_data.sections.get_many(
+        sid for b in batches.values() for sid in _link_ids(b.sections)
+    )
+    return batches, sections
+
+
+# The assembled tree, rebuilt only when a cached level changes
+_tree: Dict[str, Any] = {"key": None, "programs": []}
+
+
+async def _program_tree() -> List[dict]:
+    programs = await reference_data.programs.all()
+    batches, sections = await _resolve_tree(programs)
+    key = (reference_data.programs.version, reference_data.batches.version, reference_data.sections.version)
+    if _tree["key"] != key:
+        _tree["programs"] = [_program_out(p, batches, sections) for p in programs]
+        _tree["key"] = key
+    return _tree["programs"]
+
+
 # Programs
 @router.post("/", response_model=ProgramOut)
 async def create_program(
@@ -77,17 +96,22 @@ async def create_program(
 ) -> Any:
     program = Program(**program_in.model_dump())
     await program.insert()
-    return await _program_out(program)
+    await record_write("programs")
+    return _program_out(program, {}, {})
 
 
 @router.get("/", response_model=List[ProgramOut])
 async def read_programs(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    programs = await Program.find_all().skip(skip).limit(limit).to_list()
-    return [await _program_out(p) for p in programs]
+    not_changed = await check_collections(request, response, "programs", "batches", "sections")
+    if not_changed:
+        return not_changed
+    return list_response(request, (await _program_tree())[skip:skip + limit], response)
 
 
 # Batches
@@ -106,8 +130,9 @@ async def create_batch(
 
     program.batches.append(batch)
     await program.save()
+    await record_write("programs", "batches")
 
-    return await _batch_out(batch)
+    return _batch_out(batch, {})
 
 
 # Semesters
@@ -117,8 +142,13 @@ def _semester_out(s: Semester) -> dict:
 
 @router.get("/semesters", response_model=List[SemesterOut])
 async def list_semesters(
+    request: Request,
+    response: Response,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
+    not_changed = await check_collections(request, response, "semesters")
+    if not_changed:
+        return not_changed
     semesters = await Semester.find_all().sort("+number").to_list()
     return [_semester_out(s) for s in semesters]
 
@@ -130,6 +160,7 @@ async def create_semester(
 ) -> Any:
     semester = Semester(**semester_in.model_dump())
     await semester.insert()
+    await record_write("semesters")
     return _semester_out(semester)
 
 
@@ -139,24 +170,12 @@ async def delete_program(
     program_id: str,
     current_user: User = Depends(deps.get_current_admin_user),
 ) -> Any:
+    """Delete a program with its batches, sections, courses and timetables."""
     program = await Program.get(program_id)
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
-    # Delete associated batches
-    for link in (program.batches or []):
-        batch_id = None
-        if isinstance(link, Batch):
-            batch_id = link.id
-        elif hasattr(link, "ref"):
-            batch_id = link.ref.id if hasattr(link.ref, "id") else link.ref
-        elif hasattr(link, "id"):
-            batch_id = link.id
-        if batch_id:
-            batch = await Batch.get(batch_id)
-            if batch:
-                await batch.delete()
-    await program.delete()
-    return {"detail": "Program deleted"}
+    deleted = await delete_program_cascade(program)
+    return {"detail": "Program deleted", "deleted": deleted}
 
 
 @router.delete("/{program_id}/batches/{batch_id}")
@@ -165,24 +184,15 @@ async def delete_batch(
     batch_id: str,
     current_user: User = Depends(deps.get_current_admin_user),
 ) -> Any:
+    """Delete a batch with its sections and timetables."""
     program = await Program.get(program_id)
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
     batch = await Batch.get(batch_id)
-    if not batch:
+    if not batch or str(batch.id) not in _link_ids(program.batches):
         raise HTTPException(status_code=404, detail="Batch not found")
-    # Remove from program's batch list
-    program.batches = [
-        b for b in (program.batches or [])
-        if not (
-            (isinstance(b, Batch) and str(b.id) == batch_id)
-            or (hasattr(b, "ref") and str(getattr(b.ref, "id", b.ref)) == batch_id)
-            or (hasattr(b, "id") and str(b.id) == batch_id)
-        )
-    ]
-    await program.save()
-    await batch.delete()
-    return {"detail": "Batch deleted"}
+    deleted = await delete_batch_cascade(batch)
+    return {"detail": "Batch deleted", "deleted": deleted}
 
 
 @router.delete("/semesters/{semester_id}")
@@ -190,11 +200,12 @@ async def delete_semester(
     semester_id: str,
     current_user: User = Depends(deps.get_current_admin_user),
 ) -> Any:
+    """Delete a semester with its schedule configs and timetables."""
     semester = await Semester.get(semester_id)
     if not semester:
         raise HTTPException(status_code=404, detail="Semester not found")
-    await semester.delete()
-    return {"detail": "Semester deleted"}
+    deleted = await delete_semester_cascade(semester)
+    return {"detail": "Semester deleted", "deleted": deleted}
 
 
 # Sections
@@ -212,33 +223,89 @@ async def create_section(
     await section.insert()
     batch.sections.append(section)
     await batch.save()
+    await record_write("batches", "sections")
     return _section_out(section)
 
 
-@router.get("/{program_id}/batches/{batch_id}/sections", response_model=List[SectionOut])
-async def list_sections(
+@router.post("/{program_id}/batches/{batch_id}/sections/import", response_model=BulkImportResponse)
+async def import_sections(
     program_id: str,
     batch_id: str,
-    current_user: User = Depends(deps.get_current_active_user),
+    file: UploadFile = File(...),
+    current_user: User = Depends(deps.get_current_admin_user),
 ) -> Any:
+    """
+    Create sections for a batch from an .xlsx/.csv sheet with columns name
+    and optionally student_count. Names already used in the batch are rejected.
+    """
     batch = await Batch.get(batch_id)
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
-    sections = []
+    contents, kind = await read_upload(file)
+
+    current_ids = []
     for link in (batch.sections or []):
         if isinstance(link, Section):
-            sections.append(_section_out(link))
-        else:
-            sec_id = None
-            if hasattr(link, "ref"):
-                sec_id = link.ref.id if hasattr(link.ref, "id") else link.ref
-            elif hasattr(link, "id"):
-                sec_id = link.id
-            if sec_id:
-                sec = await Section.get(sec_id)
-                if sec:
-                    sections.append(_section_out(sec))
-    return sections
+            current_ids.append(str(link.id))
+        elif hasattr(link, "ref"):
+            current_ids.append(str(getattr(link.ref, "id", link.ref)))
+    seen = {s.name.lower() for s in (await reference_data.sections.get_many(current_ids)).values()}
+
+    total_records = 0
+    created, error_list, new_sections = [], [], []
+    for records in chunked(iter_rows(contents, kind, ["name"], ["student_count"])):
+        total_records += len(records)
+        docs, rows = [], []
+        for record in records:
+            row_num = record.pop("_row")
+            try:
+                section_in = SectionCreate(name=record["name"], student_count=record.get("student_count") or 0)
+            except ValidationError as e:
+                error_list.append({"row": row_num, "errors": error_messages(e)})
+                continue
+            if section_in.name.lower() in seen:
+                error_list.append({"row": row_num, "errors": [f"section '{section_in.name}' already exists in this batch"]})
+                continue
+            seen.add(section_in.name.lower())
+            docs.append(Section(id=PydanticObjectId(), **section_in.model_dump()))
+            rows.append(row_num)
+
+        written, insert_errors = await insert_rows(Section, docs, rows)
+        error_list += insert_errors
+        new_sections += [docs[i] for i in written]
+        created += [{"row": rows[i], "id": str(docs[i].id), "name": docs[i].name} for i in written]
+
+    if not total_records:
+        raise HTTPException(status_code=400, detail="No data rows found in the file.")
+    if new_sections:
+        batch.sections.extend(new_sections)
+        await batch.save()
+        await record_write("batches", "sections")
+    return BulkImportResponse(
+        total_records=total_records,
+        successfully_created=len(created),
+        failed=len(error_list),
+        errors=sorted(error_list, key=lambda e: e["row"]),
+        created=created,
+    )
+
+
+@router.get("/{program_id}/batches/{batch_id}/sections", response_model=List[SectionOut])
+async def list_sections(
+    request: Request,
+    response: Response,
+    program_id: str,
+    batch_id: str,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    not_changed = await check_collections(request, response, "batches", "sections")
+    if not_changed:
+        return not_changed
+    batch = await reference_data.batches.get(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    sections = await reference_data.sections.get_many(_link_ids(batch.sections))
+    return [_section_out(sections[sid]) for sid in _link_ids(batch.sections) if sid in sections]
 
 
 @router.delete("/{program_id}/batches/{batch_id}/sections/{section_id}")
@@ -248,20 +315,12 @@ async def delete_section(
     section_id: str,
     current_user: User = Depends(deps.get_current_admin_user),
 ) -> Any:
+    """Delete a section with its timetables."""
     batch = await Batch.get(batch_id)
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
     section = await Section.get(section_id)
-    if not section:
+    if not section or str(section.id) not in _link_ids(batch.sections):
         raise HTTPException(status_code=404, detail="Section not found")
-    batch.sections = [
-        s for s in (batch.sections or [])
-        if not (
-            (isinstance(s, Section) and str(s.id) == section_id)
-            or (hasattr(s, "ref") and str(getattr(s.ref, "id", s.ref)) == section_id)
-            or (hasattr(s, "id") and str(s.id) == section_id)
-        )
-    ]
-    await batch.save()
-    await section.delete()
-    return {"detail": "Section deleted"}
+    deleted = await delete_section_cascade(section)
+    return {"detail": "Section deleted", "deleted": deleted}
@@ -0,0 +1,29 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.api import deps
+from app.models.users import User
+from app.schemas.search import SearchHitOut
+from app.services.search import KINDS, search_index
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[SearchHitOut])
+async def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    types: List[str] = Query([]),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Typeahead over course codes and names, faculty names, emails and
+    departments, and room names. Every word of ``q`` must prefix a term of
+    the entity; close spellings are added when prefixes find fewer than
+    ``limit``. ``types`` (repeatable) restricts results to course, faculty
+    or room.
+    """
+    unknown = [t for t in types if t not in KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown types {unknown}. Expected: {list(KINDS)}")
+    await search_index.refresh()
+    return [hit._asdict() for hit in search_index.search(q, types or KINDS, limit)]
@@ -0,0 +1,31 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+from app.api import deps
+from app.core import security
+from app.core.principal_cache import principals
+from app.models.users import User
+from app.services.change_feed import change_feed
+from app.services.occupancy import occupancy
+from app.services.refdata import reference_data
+from app.services.search import search_index
+
+router = APIRouter()
+
+
+@router.get("/cache-stats")
+async def cache_stats(
+    current_user: User = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Hit/miss counters of the in-process caches (reference data, logins), the
+    size of the slot occupancy and search indexes, change-stream events applied and the
+    password-hashing queue.
+    """
+    return {
+        "reference_data": reference_data.stats(),
+        "occupancy": occupancy.stats(),
+        "search": search_index.stats(),
+        "change_feed": change_feed.stats(),
+        "principals": principals.stats(),
+        "password_hashing": security.hashing_stats(),
+    }
@@ -1,76 +1,52 @@
-from typing import Any, List
+from typing import Any, List, Optional
 import logging
 import traceback
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from beanie.odm.fields import PydanticObjectId
+from beanie.odm.queries.update import UpdateResponse
 import uuid
 
 from app.api import deps
+from app.api.etag import check_collections, is_not_modified, not_modified, set_etag, version_etag
+from app.api.responses import json_response, list_response
 from app.models.users import User
-from app.models.faculty import Faculty
 from app.models.courses import Course
-from app.models.infrastructure import Room
-from app.models.programs import Program, Batch, Semester, Section
-from app.models.timetable import Timetable, TimetableEntry, ScheduleConfig, BreakSlot
+from app.models.programs import Semester, Section
+from app.models.timetable import Timetable, TimetableEntry, ScheduleConfig, BreakSlot, TimetableSummary
+from app.models.versioned import VersionView
 from app.schemas.timetable import (
     TimetableOut, TimetableUpdateRequest, SimulationRequest,
     TimetableGenerateRequest, TimetableEntryOut,
-    ScheduleConfigCreate, ScheduleConfigOut,
+    ScheduleConfigCreate, ScheduleConfigOut, ConstraintOut, CandidateSlotOut,
 )
+from app.services.cascade import replace_timetables
+from app.services.constraints import CONSTRAINTS, unknown_constraints
+from app.services.electives import load_elective_matrix
 from app.services.generator import TimetableGenerator
+from app.services.occupancy import occupancy, EntryRef, FACULTY, ROOM, SECTION
+from app.services.refdata import reference_data
+from app.services.room_index import RoomIndex
+from app.services.resolver import TimetableRefs, extract_link_id, resolve_timetable_refs
+from app.services.versions import current, record_write
+from app.services.workload import faculty_load_hours, refresh_faculty_load
 
 router = APIRouter()
 
+# Collections whose names appear in timetable responses
+_NAME_COLLECTIONS = ("programs", "batches", "semesters", "sections")
 
-def _extract_link_id(link_field) -> str | None:
-    if link_field is None:
-        return None
-    if hasattr(link_field, "id"):
-        return str(link_field.id)
-    if hasattr(link_field, "ref") and link_field.ref:
-        return str(link_field.ref.id)
-    return None
 
+async def _timetable_out(t: Timetable, refs: TimetableRefs | None = None) -> dict:
+    """Serialize a timetable; pass ``refs`` when serializing many to share one name lookup."""
+    if refs is None:
+        refs = await resolve_timetable_refs([t])
+    program_id = extract_link_id(t.program) or ""
+    batch_id = extract_link_id(t.batch) or ""
+    semester_id = extract_link_id(t.semester) or ""
+    section_id = extract_link_id(t.section) or ""
 
-async def _timetable_out(t: Timetable) -> dict:
-    program_id = _extract_link_id(t.program) or ""
-    batch_id = _extract_link_id(t.batch) or ""
-    semester_id = _extract_link_id(t.semester) or ""
-    section_id = _extract_link_id(t.section) or ""
-
-    # Resolve human-readable names
-    program_name = ""
-    batch_name = ""
-    semester_name = ""
-    section_name = ""
-    try:
-        if program_id:
-            prog = await Program.get(PydanticObjectId(program_id))
-            if prog:
-                program_name = prog.name
-    except Exception:
-        pass
-    try:
-        if batch_id:
-            b = await Batch.get(PydanticObjectId(batch_id))
-            if b:
-                batch_name = b.name
-    except Exception:
-        pass
-    try:
-        if semester_id:
-            sem = await Semester.get(PydanticObjectId(semester_id))
-            if sem:
-                semester_name = str(sem.number) if hasattr(sem, 'number') else sem.name
-    except Exception:
-        pass
-    try:
-        if section_id:
-            sec = await Section.get(PydanticObjectId(section_id))
-            if sec:
-                section_name = sec.name
-    except Exception:
-        pass
+    sem = refs.semester(semester_id)
+    semester_name = (str(sem.number) if sem.number is not None else sem.name) if sem else ""
 
     return {
         "id": str(t.id),
@@ -78,10 +54,10 @@ async def _timetable_out(t: Timetable) -> dict:
         "batch_id": batch_id,
         "semester_id": semester_id,
         "section_id": section_id,
-        "program_name": program_name,
-        "batch_name": batch_name,
+        "program_name": refs.program_name(program_id),
+        "batch_name": refs.batch_name(batch_id),
         "semester_name": semester_name,
-        "section_name": section_name,
+        "section_name": refs.section_name(section_id),
         "entries": [
             {
                 "entry_id": e.entry_id,
@@ -99,28 +75,95 @@ async def _timetable_out(t: Timetable) -> dict:
             }
             for e in (t.entries or [])
         ],
+        "entry_count": len(t.entries or []),
+        "is_draft": t.is_draft,
+        "version": t.version,
+    }
+
+
+def _timetable_summary_out(t: TimetableSummary, refs: TimetableRefs) -> dict:
+    program_id = extract_link_id(t.program) or ""
+    batch_id = extract_link_id(t.batch) or ""
+    semester_id = extract_link_id(t.semester) or ""
+    section_id = extract_link_id(t.section) or ""
+    sem = refs.semester(semester_id)
+    return {
+        "id": str(t.id),
+        "program_id": program_id,
+        "batch_id": batch_id,
+        "semester_id": semester_id,
+        "section_id": section_id,
+        "program_name": refs.program_name(program_id),
+        "batch_name": refs.batch_name(batch_id),
+        "semester_name": (str(sem.number) if sem.number is not None else sem.name) if sem else "",
+        "section_name": refs.section_name(section_id),
+        "entries": [],
+        "entry_count": t.entry_count,
         "is_draft": t.is_draft,
+        "version": t.version,
     }
 
 @router.get("/", response_model=List[TimetableOut])
 async def get_all_timetables(
+    request: Request,
+    response: Response,
+    program_id: Optional[PydanticObjectId] = None,
+    batch_id: Optional[PydanticObjectId] = None,
+    semester_id: Optional[PydanticObjectId] = None,
+    section_id: Optional[PydanticObjectId] = None,
+    is_draft: Optional[bool] = None,
+    cursor: Optional[PydanticObjectId] = None,
+    limit: int = Query(100, ge=1, le=500),
+    fields: str = Query("full", pattern="^(full|summary)$"),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get all saved timetables.
+    List saved timetables, oldest first, in pages of ``limit``.
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` for the next page.
+    ``fields=summary`` omits entries (projected out in Mongo); fetch them via ``GET /timetables/{id}``.
+    Send ``Accept: application/x-ndjson`` to stream one timetable per line.
     """
+    not_changed = await check_collections(request, response, "timetables", *_NAME_COLLECTIONS)
+    if not_changed:
+        return not_changed
+    query: dict = {}
+    for key, value in (
+        ("program.$id", program_id),
+        ("batch.$id", batch_id),
+        ("semester.$id", semester_id),
+        ("section.$id", section_id),
+        ("is_draft", is_draft),
+    ):
+        if value is not None:
+            query[key] = value
+    if cursor is not None:
+        query["_id"] = {"$gt": cursor}
+
     try:
-        timetables = await Timetable.find_all().to_list()
+        find = Timetable.find(query).sort("+_id").limit(limit + 1)
+        if fields == "summary":
+            timetables = await find.project(TimetableSummary).to_list()
+        else:
+            timetables = await find.to_list()
     except Exception as e:
         logging.exception("Error loading timetables")
         raise HTTPException(status_code=500, detail=f"Error loading timetables: {str(e)}")
+
+    if len(timetables) > limit:
+        timetables = timetables[:limit]
+        response.headers["X-Next-Cursor"] = str(timetables[-1].id)
+
+    refs = await resolve_timetable_refs(timetables)
     results = []
     for t in timetables:
         try:
-            results.append(await _timetable_out(t))
+            if fields == "summary":
+                results.append(_timetable_summary_out(t, refs))
+            else:
+                results.append(await _timetable_out(t, refs))
         except Exception:
             logging.warning(f"Skipping corrupt timetable {t.id}")
-    return results
+    return list_response(request, results, response)
 
 @router.post("/generate", response_model=TimetableOut)
 async def generate_timetable(
@@ -129,44 +172,37 @@ async def generate_timetable(
 ) -> Any:
     """
     Generate timetables for all sections in a batch (or specific sections).
-    Creates one timetable per section, all scheduled together to avoid conflicts.
+    Creates one timetable per section, all scheduled together to avoid conflicts,
+    replacing the existing timetables of those sections for this semester.
     Returns the first timetable; all are saved.
     """
-    program = await Program.get(gen_request.program_id)
-    batch = await Batch.get(gen_request.batch_id)
-    semester = await Semester.get(gen_request.semester_id)
+    program = await reference_data.programs.get(gen_request.program_id)
+    batch = await reference_data.batches.get(gen_request.batch_id)
+    semester = await reference_data.semesters.get(gen_request.semester_id)
     if not all([program, batch, semester]):
         raise HTTPException(status_code=404, detail="Program, Batch, or Semester not found.")
 
-    # Resolve sections for this batch
-    sections_to_schedule: List[Section] = []
+    # Resolve sections for this batch (one cache lookup, at most one $in)
     if gen_request.section_ids:
-        for sid in gen_request.section_ids:
-            sec = await Section.get(sid)
-            if sec:
-                sections_to_schedule.append(sec)
+        section_ids = [str(sid) for sid in gen_request.section_ids]
     else:
-        # Get all sections from batch
+        section_ids = []
         for link in (batch.sections or []):
-            sec_id = None
             if isinstance(link, Section):
-                sections_to_schedule.append(link)
-                continue
-            if hasattr(link, "ref"):
-                sec_id = link.ref.id if hasattr(link.ref, "id") else link.ref
+                section_ids.append(str(link.id))
+            elif hasattr(link, "ref"):
+                section_ids.append(str(link.ref.id if hasattr(link.ref, "id") else link.ref))
             elif hasattr(link, "id"):
-                sec_id = link.id
-            if sec_id:
-                sec = await Section.get(sec_id)
-                if sec:
-                    sections_to_schedule.append(sec)
+                section_ids.append(str(link.id))
+    found_sections = await reference_data.sections.get_many(section_ids)
+    sections_to_schedule: List[Section] = [found_sections[sid] for sid in section_ids if sid in found_sections]
 
     # Use raw MongoDB field matching
     courses = await Course.find(
         {"program.$id": program.id, "semester.$id": semester.id}
     ).to_list()
-    faculty = await Faculty.find_all().to_list()
-    rooms = await Room.find_all().to_list()
+    faculty = await reference_data.faculty.all()
+    rooms = await reference_data.rooms.all()
     
     if not courses:
         raise HTTPException(status_code=400, detail="No courses found for the specified program and semester.")
@@ -188,6 +224,22 @@ async def generate_timetable(
 
     periods_per_day = schedule_config.periods_per_day if schedule_config else 8
     working_days = schedule_config.working_days if schedule_config else None
+    constraint_weights = schedule_config.constraint_weights if schedule_config else None
+    disabled_constraints = schedule_config.disabled_constraints if schedule_config else None
+
+    # Timetables this run replaces: the batch's current ones for the same
+    # semester and the sections being scheduled (sibling sections keep theirs).
+    superseded_query: dict = {"batch.$id": batch.id, "semester.$id": semester.id}
+    if sections_to_schedule:
+        superseded_query["section.$id"] = {"$in": [s.id for s in sections_to_schedule]}
+    else:
+        superseded_query["section"] = None
+    superseded = [v.id for v in await Timetable.find(superseded_query).project(VersionView).to_list()]
+    own_timetables = [str(tid) for tid in superseded]
+
+    # Load already carried by faculty in every timetable this run keeps
+    faculty_base_load = await faculty_load_hours({"_id": {"$nin": superseded}})
+    elective_clashes = await load_elective_matrix(batch.id)
 
     generator = TimetableGenerator(
         courses=courses,
@@ -197,6 +249,12 @@ async def generate_timetable(
         sections=sections_to_schedule if sections_to_schedule else None,
         periods_per_day=periods_per_day,
         working_days=working_days,
+        constraint_weights=constraint_weights,
+        disabled_constraints=disabled_constraints,
+        faculty_base_load=faculty_base_load,
+        elective_clashes=elective_clashes,
+        faculty_booked_elsewhere=occupancy.busy_map(FACULTY, own_timetables),
+        room_booked_elsewhere=occupancy.busy_map(ROOM, own_timetables),
     )
     try:
         best_chromosome = generator.run()
@@ -224,7 +282,7 @@ async def generate_timetable(
         sec_key = gene.section_id or gene.batch_id
         genes_by_section.setdefault(sec_key, []).append(gene)
     
-    saved_timetables = []
+    new_timetables = []
     
     for sec_key, genes in genes_by_section.items():
         entries = []
@@ -248,25 +306,25 @@ async def generate_timetable(
             )
             entries.append(entry)
 
-        new_timetable = Timetable(
+        new_timetables.append(Timetable(
             program=program,
             batch=batch,
             semester=semester,
             section=sec_obj if sec_obj else None,
             entries=entries,
             is_draft=False
-        )
-        try:
-            await new_timetable.insert()
-            saved_timetables.append(new_timetable)
-        except Exception as e:
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=f"Save error: {str(e)}")
-    
+        ))
+
+    if not new_timetables:
+        raise HTTPException(status_code=500, detail="No timetables were generated.")
+    try:
+        await replace_timetables(superseded, new_timetables)
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Save error: {str(e)}")
+
     # Return the first timetable (all are saved)
-    if saved_timetables:
-        return await _timetable_out(saved_timetables[0])
-    raise HTTPException(status_code=500, detail="No timetables were generated.")
+    return await _timetable_out(new_timetables[0])
 
 
 @router.post("/simulate", response_model=Any)
@@ -277,10 +335,10 @@ async def simulate_timetable(
     """
     Run a 'what-if' simulation for timetable generation without saving the result.
     """
-    real_faculty = await Faculty.find_all().to_list()
+    real_faculty = await reference_data.faculty.all()
     real_courses = await Course.find_all().to_list()
-    real_rooms = await Room.find_all().to_list()
-    real_batches = await Batch.find_all().to_list()
+    real_rooms = await reference_data.rooms.all()
+    real_batches = await reference_data.batches.all()
 
     faculty_map = {str(f.id): f for f in real_faculty}
     for h_faculty in sim_request.hypothetical_faculty:
@@ -313,15 +371,199 @@ async def simulate_timetable(
 @router.get("/{id}", response_model=TimetableOut)
 async def get_timetable(
     id: PydanticObjectId,
+    request: Request,
+    response: Response,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get a specific timetable by its ID.
+    Get a specific timetable by its ID. Answers ``If-None-Match`` with a 304
+    after reading only its version and those of the collections it names.
+    """
+    view = await Timetable.find_one({"_id": id}).project(VersionView)
+    if not view:
+        raise HTTPException(status_code=404, detail="Timetable not found.")
+    versions, _ = await current(_NAME_COLLECTIONS)
+    etag = version_etag("timetable", id, view.version, *sorted(versions.items()))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    timetable = await Timetable.get(id)
+    if not timetable:
+        raise HTTPException(status_code=404, detail="Timetable not found.")
+    return json_response(await _timetable_out(timetable), response)
+
+async def _validate_entry_moves(timetable: Timetable, entries_by_id: dict, targets: dict) -> dict:
+    """
+    Check a set of simultaneous moves ({entry_id: (day, period, room_id)})
+    against faculty busy time, the timetable as it will look afterwards and
+    every other timetable's bookings. Returns the field updates to apply.
+    """
+    room_ids = {room_id for _, _, room_id in targets.values()}
+    rooms = await reference_data.rooms.get_many(room_ids)
+    room_names = {rid: r.name for rid, r in rooms.items()}
+    missing = room_ids - room_names.keys()
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Room not found: {sorted(missing)[0]}")
+
+    faculty_ids = {entries_by_id[entry_id].faculty_id for entry_id in targets}
+    faculty = await reference_data.faculty.get_many(f for f in faculty_ids if f)
+    busy_by_faculty = {
+        fid: (f.name, {(slot.day, p) for slot in f.busy_slots for p in slot.periods})
+        for fid, f in faculty.items()
+    }
+
+    # Final placement of every entry once all moves are applied
+    placed = {}
+    for e in timetable.entries:
+        day, period, room_id = targets.get(e.entry_id, (e.day, e.period, e.room_id))
+        placed[e.entry_id] = ((day, period), room_id)
+
+    holders: dict = {}
+    for e in timetable.entries:
+        slot, room_id = placed[e.entry_id]
+        for key in (("faculty", e.faculty_id), ("batch", e.batch_id), ("room", room_id)):
+            holders.setdefault((key, slot), []).append(e)
+
+    ignore = [str(timetable.id)]
+    updates = {}
+    for entry_id, (day, period, room_id) in targets.items():
+        entry = entries_by_id[entry_id]
+        new_slot = (day, period)
+
+        name, busy_slots = busy_by_faculty.get(entry.faculty_id, (entry.faculty_name, set()))
+        if new_slot in busy_slots:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Conflict: New slot {new_slot} is in faculty {name}'s predefined busy time."
+            )
+
+        for key, message in (
+            (("faculty", entry.faculty_id), f"Faculty {entry.faculty_name} is already scheduled at {new_slot}."),
+            (("batch", entry.batch_id), f"Batch is already scheduled for a class at {new_slot}."),
+            (("room", room_id), f"Room {room_names[room_id]} is already booked at {new_slot}."),
+        ):
+            if len(holders.get((key, new_slot), [])) > 1:
+                raise HTTPException(status_code=409, detail=f"Conflict: {message}")
+
+        # Bookings held by every other timetable in the institution
+        for kind, rid, label in (
+            (FACULTY, entry.faculty_id, "Faculty"),
+            (ROOM, room_id, "Room"),
+            (SECTION, entry.section_id or entry.batch_id, "Section"),
+        ):
+            if rid and occupancy.is_busy(kind, rid, new_slot, ignore_timetables=ignore):
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Conflict: {label} is already booked at {new_slot} in another timetable."
+                )
+
+        updates[entry_id] = {
+            "day": day,
+            "period": period,
+            "room_id": room_id,
+            "room_name": room_names[room_id],
+        }
+    return updates
+
+
+async def _apply_entry_updates(timetable: Timetable, version: int, updates: dict) -> Timetable:
+    """
+    Set fields on embedded entries in one ``update_one`` (``entries.$[eN]`` with
+    array filters), guarded on ``version`` and bumping it. ``updates`` maps
+    entry_id -> {field: value}. Raises 409 if the timetable changed meanwhile.
+    """
+    fields, array_filters = {}, []
+    for n, (entry_id, changes) in enumerate(updates.items()):
+        for name, value in changes.items():
+            fields[f"entries.$[e{n}].{name}"] = value
+        array_filters.append({f"e{n}.entry_id": entry_id})
+
+    # Documents written before versioning have no field; treat them as version 0
+    version_filter = version if version else {"$in": [0, None]}
+    updated = await Timetable.find_one({"_id": timetable.id, "version": version_filter}).update(
+        {"$set": fields, "$inc": {"version": 1}},
+        array_filters=array_filters,
+        response_type=UpdateResponse.NEW_DOCUMENT,
+    )
+    if updated is None:
+        raise HTTPException(
+            status_code=409,
+            detail="Timetable was modified by another edit. Reload it and try again.",
+        )
+    occupancy.index_timetable(updated)
+    await record_write("timetables")
+    return updated
+
+
+@router.get("/{id}/entries/{entry_id}/candidates", response_model=List[CandidateSlotOut])
+async def get_entry_candidates(
+    id: PydanticObjectId,
+    entry_id: str,
+    current_user: User = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Every (day, period, room) an entry could be moved to without a hard
+    conflict: faculty busy time, faculty/section/room bookings across all
+    timetables, and lab rooms for practicals (lecture rooms otherwise).
     """
     timetable = await Timetable.get(id)
     if not timetable:
         raise HTTPException(status_code=404, detail="Timetable not found.")
-    return await _timetable_out(timetable)
+    entry = next((e for e in timetable.entries if e.entry_id == entry_id), None)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Timetable entry not found.")
+
+    # Without a semester (or a config for it) the default days and periods apply
+    config = None
+    semester_id = extract_link_id(timetable.semester)
+    if semester_id:
+        config = await ScheduleConfig.find_one({"semester.$id": PydanticObjectId(semester_id)})
+    days = config.working_days if config and config.working_days else [
+        "Monday", "Tuesday", "Wednesday", "Thursday", "Friday"
+    ]
+    periods_per_day = config.periods_per_day if config else 8
+    all_periods = ((1 << (periods_per_day + 1)) - 1) & ~1  # periods are 1-based
+
+    rooms = await reference_data.rooms.all()
+    room_index = RoomIndex(rooms)
+    course = await Course.get(PydanticObjectId(entry.course_id)) if PydanticObjectId.is_valid(entry.course_id) else None
+    comp = course.components if course else None
+    if comp and comp.practical and not (comp.lecture or comp.tutorial):
+        is_practical = True
+    elif comp and not comp.practical:
+        is_practical = False
+    else:
+        # Mixed course: the entry is a practical if it currently sits in a lab
+        current = next((r for r in rooms if str(r.id) == entry.room_id), None)
+        is_practical = bool(current and (current.type or "").lower() == "lab")
+    candidate_rooms = room_index.buckets["lab" if is_practical else "lecture"]
+
+    faculty = await reference_data.faculty.get(entry.faculty_id)
+    busy_masks: dict = {}
+    for slot in (faculty.busy_slots if faculty else []):
+        for p in slot.periods:
+            busy_masks[slot.day] = busy_masks.get(slot.day, 0) | (1 << p)
+
+    moving = EntryRef(str(timetable.id), entry.entry_id)
+    section_id = entry.section_id or entry.batch_id
+    candidates = []
+    for day in days:
+        free = all_periods & ~busy_masks.get(day, 0)
+        free &= ~occupancy.day_mask(FACULTY, entry.faculty_id, day, moving)
+        free &= ~occupancy.day_mask(SECTION, section_id, day, moving)
+        if not free:
+            continue
+        for room in candidate_rooms:
+            room_id = str(room.id)
+            room_free = free & ~occupancy.day_mask(ROOM, room_id, day, moving)
+            p = 0
+            while room_free >> p:
+                if room_free >> p & 1 and (day, p, room_id) != (entry.day, entry.period, entry.room_id):
+                    candidates.append({"day": day, "period": p, "room_id": room_id, "room_name": room.name})
+                p += 1
+    return candidates
+
 
 @router.patch("/{id}", response_model=TimetableOut)
 async def update_timetable_entry(
@@ -330,61 +572,53 @@ async def update_timetable_entry(
     current_user: User = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
-    Dynamically edit a timetable entry (e.g., move to a new slot).
+    Dynamically edit timetable entries. Actions:
+      * ``move_entry``   – move ``payload`` to a new slot/room
+      * ``batch_move``   – move every entry in ``moves`` together
+      * ``swap_entries`` – exchange the slots and rooms of ``swap``'s two entries
+    All moves are validated against the resulting timetable as a whole and
+    written in one atomic update.
     """
     timetable = await Timetable.get(id)
     if not timetable:
         raise HTTPException(status_code=404, detail="Timetable not found.")
+    version = update_request.version if update_request.version is not None else timetable.version
+    if version != timetable.version:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Stale timetable version {version}; current version is {timetable.version}.",
+        )
 
-    if update_request.action == "move_entry":
-        payload = update_request.payload
-        
-        entry_to_move = next((e for e in timetable.entries if e.entry_id == payload.entry_id), None)
-        if not entry_to_move:
+    entries_by_id = {e.entry_id: e for e in timetable.entries}
+
+    # Resolve the action into {entry_id: (day, period, room_id)}
+    targets: dict = {}
+    if update_request.action == "move_entry" and update_request.payload:
+        p = update_request.payload
+        targets[p.entry_id] = (p.day, p.period, str(p.room_id))
+    elif update_request.action == "batch_move" and update_request.moves:
+        for p in update_request.moves:
+            if p.entry_id in targets:
+                raise HTTPException(status_code=400, detail=f"Entry {p.entry_id} is moved more than once.")
+            targets[p.entry_id] = (p.day, p.period, str(p.room_id))
+    elif update_request.action == "swap_entries" and update_request.swap:
+        a = entries_by_id.get(update_request.swap.entry_id_a)
+        b = entries_by_id.get(update_request.swap.entry_id_b)
+        if not a or not b:
             raise HTTPException(status_code=404, detail="Timetable entry not found.")
+        if a.entry_id == b.entry_id:
+            raise HTTPException(status_code=400, detail="Cannot swap an entry with itself.")
+        targets[a.entry_id] = (b.day, b.period, b.room_id)
+        targets[b.entry_id] = (a.day, a.period, a.room_id)
+    else:
+        raise HTTPException(status_code=400, detail="Invalid action.")
 
-        new_slot = (payload.day, payload.period)
-        new_room_id = str(payload.room_id)
-        
-        faculty = await Faculty.get(PydanticObjectId(entry_to_move.faculty_id))
-        if faculty:
-            busy_slots = set((slot.day, p) for slot in faculty.busy_slots for p in slot.periods)
-            if new_slot in busy_slots:
-                raise HTTPException(
-                    status_code=409, 
-                    detail=f"Conflict: New slot {new_slot} is in faculty {faculty.name}'s predefined busy time."
-                )
-
-        for entry in timetable.entries:
-            if entry.entry_id == entry_to_move.entry_id:
-                continue
-
-            entry_slot = (entry.day, entry.period)
-            if entry_slot == new_slot:
-                if entry.faculty_id == entry_to_move.faculty_id:
-                    raise HTTPException(
-                        status_code=409, 
-                        detail=f"Conflict: Faculty {entry.faculty_name} is already scheduled at {new_slot}."
-                    )
-                if entry.batch_id == entry_to_move.batch_id:
-                     raise HTTPException(
-                        status_code=409, 
-                        detail=f"Conflict: Batch is already scheduled for a class at {new_slot}."
-                    )
-                if entry.room_id == new_room_id:
-                    raise HTTPException(
-                        status_code=409, 
-                        detail=f"Conflict: Room {entry.room_name} is already booked at {new_slot}."
-                    )
-        
-        entry_to_move.day = payload.day
-        entry_to_move.period = payload.period
-        entry_to_move.room_id = new_room_id
-        
-        await timetable.save()
-        return await _timetable_out(timetable)
+    if any(entry_id not in entries_by_id for entry_id in targets):
+        raise HTTPException(status_code=404, detail="Timetable entry not found.")
 
-    raise HTTPException(status_code=400, detail="Invalid action.")
+    updates = await _validate_entry_moves(timetable, entries_by_id, targets)
+    updated = await _apply_entry_updates(timetable, version, updates)
+    return await _timetable_out(updated)
 
 
 @router.delete("/{id}")
@@ -399,6 +633,9 @@ async def delete_timetable(
     if not timetable:
         raise HTTPException(status_code=404, detail="Timetable not found.")
     await timetable.delete()
+    occupancy.remove_timetable(str(id))
+    await record_write("timetables")
+    await refresh_faculty_load()
     return {"detail": "Timetable deleted successfully.", "id": str(id)}
 
 
@@ -407,11 +644,11 @@ async def delete_timetable(
 # ═══════════════════════════════════════════════════════════════════
 
 async def _schedule_config_out(c: ScheduleConfig) -> dict:
-    semester_id = _extract_link_id(c.semester) or ""
+    semester_id = extract_link_id(c.semester) or ""
     semester_name = ""
     if semester_id:
         try:
-            sem = await Semester.get(PydanticObjectId(semester_id))
+            sem = await reference_data.semesters.get(semester_id)
             if sem:
                 semester_name = f"Sem {sem.number}" if hasattr(sem, "number") else sem.name
         except Exception:
@@ -426,16 +663,46 @@ async def _schedule_config_out(c: ScheduleConfig) -> dict:
         "periods_per_day": c.periods_per_day,
         "breaks": [b.model_dump() for b in (c.breaks or [])],
         "working_days": c.working_days or [],
+        "constraint_weights": c.constraint_weights or {},
+        "disabled_constraints": c.disabled_constraints or [],
     }
 
 
+def _validate_constraint_settings(config_in: ScheduleConfigCreate) -> None:
+    unknown = unknown_constraints(list(config_in.constraint_weights) + list(config_in.disabled_constraints))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown constraints: {sorted(set(unknown))}. Available: {sorted(CONSTRAINTS)}",
+        )
+    negative = [name for name, w in config_in.constraint_weights.items() if w < 0]
+    if negative:
+        raise HTTPException(status_code=400, detail=f"Constraint weights must be >= 0: {negative}")
+
+
+@router.get("/schedule-configs/constraints", response_model=List[ConstraintOut])
+async def list_constraints(
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """List the generator's constraints with their default weights."""
+    return [
+        {"name": c.name, "kind": c.kind, "default_weight": c.weight, "description": c.description}
+        for c in CONSTRAINTS.values()
+    ]
+
+
 @router.get("/schedule-configs/", response_model=List[ScheduleConfigOut])
 async def get_schedule_configs(
+    request: Request,
+    response: Response,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    """List all schedule configurations."""
+    """List all schedule configurations. Supports conditional requests via ETag / If-None-Match."""
+    not_changed = await check_collections(request, response, "schedule_configs", "semesters")
+    if not_changed:
+        return not_changed
     configs = await ScheduleConfig.find_all().to_list()
-    return [await _schedule_config_out(c) for c in configs]
+    return list_response(request, [await _schedule_config_out(c) for c in configs], response)
 
 
 @router.post("/schedule-configs/", response_model=ScheduleConfigOut)
@@ -444,6 +711,7 @@ async def create_schedule_config(
     current_user: User = Depends(deps.get_current_admin_user),
 ) -> Any:
     """Create a new schedule configuration (timings, breaks, working days)."""
+    _validate_constraint_settings(config_in)
     config = ScheduleConfig(
         name=config_in.name,
         start_time=config_in.start_time,
@@ -451,12 +719,15 @@ async def create_schedule_config(
         periods_per_day=config_in.periods_per_day,
         breaks=[BreakSlot(**b.model_dump()) for b in config_in.breaks],
         working_days=config_in.working_days,
+        constraint_weights=config_in.constraint_weights,
+        disabled_constraints=config_in.disabled_constraints,
     )
     if config_in.semester_id:
         sem = await Semester.get(PydanticObjectId(config_in.semester_id))
         if sem:
             config.semester = sem
     await config.insert()
+    await record_write("schedule_configs")
     return await _schedule_config_out(config)
 
 
@@ -467,6 +738,7 @@ async def update_schedule_config(
     current_user: User = Depends(deps.get_current_admin_user),
 ) -> Any:
     """Update an existing schedule configuration."""
+    _validate_constraint_settings(config_in)
     config = await ScheduleConfig.get(config_id)
     if not config:
         raise HTTPException(status_code=404, detail="Schedule config not found.")
@@ -476,6 +748,8 @@ async def update_schedule_config(
     config.periods_per_day = config_in.periods_per_day
     config.breaks = [BreakSlot(**b.model_dump()) for b in config_in.breaks]
     config.working_days = config_in.working_days
+    config.constraint_weights = config_in.constraint_weights
+    config.disabled_constraints = config_in.disabled_constraints
     if config_in.semester_id:
         sem = await Semester.get(PydanticObjectId(config_in.semester_id))
         if sem:
@@ -483,6 +757,7 @@ async def update_schedule_config(
     else:
         config.semester = None
     await config.save()
+    await record_write("schedule_configs")
     return await _schedule_config_out(config)
 
 
@@ -496,6 +771,7 @@ async def delete_schedule_config(
     if not config:
         raise HTTPException(status_code=404, detail="Schedule config not found.")
     await config.delete()
+    await record_write("schedule_configs")
     return {"detail": "Schedule config deleted.", "id": str(config_id)}
 
 
@@ -520,5 +796,7 @@ async def get_schedule_config_by_semester(
             "periods_per_day": 8,
             "breaks": [],
             "working_days": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"],
+            "constraint_weights": {},
+            "disabled_constraints": [],
         }
     return await _schedule_config_out(configs[0])
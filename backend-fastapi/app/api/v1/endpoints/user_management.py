@@ -1,11 +1,16 @@
 import io
-from typing import Any, List
+from typing import Any, Iterator, List
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from beanie import PydanticObjectId
+from beanie.operators import In
 from openpyxl import load_workbook
+from pydantic import BaseModel, ValidationError
 from app.core import security
-from app.models.users import User
+from app.core.principal_cache import principals
+from app.models.users import EMAIL_COLLATION, User
 from app.schemas.user import UserOut, BulkUserUploadResponse
 from app.api.deps import get_current_admin_user
+from app.api.imports import IMPORT_BATCH_SIZE, chunked, insert_rows
 
 router = APIRouter()
 
@@ -13,40 +18,41 @@ VALID_ROLES = {"admin", "faculty", "hod", "student", "deo"}
 EXPECTED_COLUMNS = ["full_name", "username", "email", "password", "role"]
 
 
+class EmailView(BaseModel):
+    email: str
+
+
 def validate_excel_headers(headers: list) -> bool:
     normalized = [str(h).strip().lower() for h in headers if h is not None]
     return normalized == EXPECTED_COLUMNS
 
 
-def parse_excel_file(file_bytes: bytes) -> List[dict]:
+def parse_excel_file(file_bytes: bytes) -> Iterator[dict]:
+    """Yield one record per non-empty data row, reading the sheet row by row."""
     workbook = load_workbook(filename=io.BytesIO(file_bytes), read_only=True)
-    sheet = workbook.active
-
-    rows = list(sheet.iter_rows(values_only=True))
-    if not rows:
-        raise HTTPException(status_code=400, detail="Excel file is empty.")
-
-    headers = rows[0]
-    if not validate_excel_headers(list(headers)):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid columns. Expected: {EXPECTED_COLUMNS}. "
-                   f"Got: {[str(h).strip().lower() for h in headers if h]}",
-        )
-
-    records = []
-    for row_num, row in enumerate(rows[1:], start=2):
-        if all(cell is None or str(cell).strip() == "" for cell in row):
-            continue
-        record = {}
-        for col_idx, col_name in enumerate(EXPECTED_COLUMNS):
-            value = row[col_idx] if col_idx < len(row) else None
-            record[col_name] = str(value).strip() if value is not None else ""
-        record["_row"] = row_num
-        records.append(record)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = next(rows, None)
+        if headers is None:
+            raise HTTPException(status_code=400, detail="Excel file is empty.")
+        if not validate_excel_headers(list(headers)):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid columns. Expected: {EXPECTED_COLUMNS}. "
+                       f"Got: {[str(h).strip().lower() for h in headers if h]}",
+            )
 
-    workbook.close()
-    return records
+        for row_num, row in enumerate(rows, start=2):
+            if all(cell is None or str(cell).strip() == "" for cell in row):
+                continue
+            record = {}
+            for col_idx, col_name in enumerate(EXPECTED_COLUMNS):
+                value = row[col_idx] if col_idx < len(row) else None
+                record[col_name] = str(value).strip() if value is not None else ""
+            record["_row"] = row_num
+            yield record
+    finally:
+        workbook.close()
 
 
 def validate_record(record: dict) -> List[str]:
@@ -80,49 +86,71 @@ async def create_users(
     if len(contents) > 5 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="File too large. Max 5 MB.")
 
-    records = parse_excel_file(contents)
-    if not records:
-        raise HTTPException(status_code=400, detail="No data rows found in the file.")
-
-    # Pre-fetch existing emails to detect duplicates
-    existing_users = await User.find_all().to_list()
-    existing_emails = {u.email.lower() for u in existing_users}
-
+    total_records = 0
     seen_emails = set()
     successfully_created = 0
     created_users = []
     error_list = []
 
-    for record in records:
-        row_num = record.pop("_row")
+    for records in chunked(parse_excel_file(contents), IMPORT_BATCH_SIZE):
+        total_records += len(records)
+
+        # Only this batch's emails are looked up, ignoring case (email_ci index)
+        emails = list({r["email"] for r in records if r.get("email")})
+        existing_emails = {
+            u.email.lower()
+            for u in await User.find(In(User.email, emails), collation=EMAIL_COLLATION).project(EmailView).to_list()
+        }
+
+        accepted = []
+        new_users = []
+        for record in records:
+            row_num = record.pop("_row")
+
+            validation_errors = validate_record(record)
+            if validation_errors:
+                error_list.append({"row": row_num, "errors": validation_errors})
+                continue
+
+            email_lower = record["email"].lower()
+
+            if email_lower in existing_emails:
+                error_list.append({"row": row_num, "errors": [f"email '{record['email']}' already exists in database"]})
+                continue
+
+            if email_lower in seen_emails:
+                error_list.append({"row": row_num, "errors": [f"duplicate email '{record['email']}' in file"]})
+                continue
+
+            try:
+                new_user = User(
+                    id=PydanticObjectId(),
+                    full_name=record["full_name"],
+                    email=record["email"],
+                    hashed_password="",
+                    role=record["role"].lower(),
+                )
+            except ValidationError as e:
+                error_list.append({"row": row_num, "errors": [str(e)]})
+                continue
 
-        validation_errors = validate_record(record)
-        if validation_errors:
-            error_list.append({"row": row_num, "errors": validation_errors})
-            continue
-
-        email_lower = record["email"].lower()
+            seen_emails.add(email_lower)
+            accepted.append((row_num, record["password"]))
+            new_users.append(new_user)
 
-        if email_lower in existing_emails:
-            error_list.append({"row": row_num, "errors": [f"email '{record['email']}' already exists in database"]})
+        if not accepted:
             continue
 
-        if email_lower in seen_emails:
-            error_list.append({"row": row_num, "errors": [f"duplicate email '{record['email']}' in file"]})
-            continue
+        # Hash all passwords in parallel on the bcrypt pool
+        hashed_passwords = await security.get_password_hashes([password for _, password in accepted])
+        for new_user, hashed_password in zip(new_users, hashed_passwords):
+            new_user.hashed_password = hashed_password
 
-        try:
-            hashed_password = security.get_password_hash(record["password"])
-            new_user = User(
-                full_name=record["full_name"],
-                email=record["email"],
-                hashed_password=hashed_password,
-                role=record["role"].lower(),
-            )
-            await new_user.insert()
-
-            seen_emails.add(email_lower)
-            existing_emails.add(email_lower)
+        # Unordered: one bad row (e.g. a concurrent duplicate) doesn't stop the rest
+        written, insert_errors = await insert_rows(User, new_users, [row_num for row_num, _ in accepted])
+        error_list += insert_errors
+        for i in written:
+            new_user = new_users[i]
             successfully_created += 1
             created_users.append(UserOut(
                 id=str(new_user.id),
@@ -131,14 +159,15 @@ async def create_users(
                 role=new_user.role,
                 is_active=new_user.is_active,
             ))
-        except Exception as e:
-            error_list.append({"row": row_num, "errors": [str(e)]})
+
+    if not total_records:
+        raise HTTPException(status_code=400, detail="No data rows found in the file.")
 
     return BulkUserUploadResponse(
-        total_records=len(records),
+        total_records=total_records,
         successfully_created=successfully_created,
         failed=len(error_list),
-        errors=error_list,
+        errors=sorted(error_list, key=lambda e: e["row"]),
         created_users=created_users,
     )
 
@@ -174,4 +203,5 @@ async def delete_user(
     if str(user.id) == str(current_user.id):
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
     await user.delete()
+    principals.invalidate_user(user.id)
     return {"message": "User deleted successfully"}
\ No newline at end of file
@@ -39,7 +39,7 @@ async def create_user(
         )
     user = User(
         email=user_in.email,
-        hashed_password=security.get_password_hash(user_in.password),
+        hashed_password=await security.get_password_hash_async(user_in.password),
         full_name=user_in.full_name,
         role=user_in.role,
     )
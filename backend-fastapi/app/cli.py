@@ -0,0 +1,271 @@
+"""
+Command-line entry point for running the timetable solver offline.
+
+Usage (from ``backend-fastapi/``):
+
+    python -m app.cli solve snapshot.json --out result.json --generations 200 --seed 7
+    python -m app.cli export snapshot.json --program-id ... --batch-id ... --semester-id ...
+    python -m app.cli check-indexes
+    python -m app.cli bench-serialize --timetables 50 --entries 300
+
+``solve`` and ``bench-serialize`` need no database; ``export`` and
+``check-indexes`` connect using the usual ``.env`` settings.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import List, Optional
+
+from app.services.generator import TimetableGenerator
+from app.services.snapshot import Snapshot, load_snapshot, save_snapshot
+
+# Solver engines selectable with --engine. The GA is currently the only one.
+ENGINES = {
+    "ga": TimetableGenerator,
+}
+
+GA_OPTIONS = ("population_size", "generations", "mutation_rate", "elite_size", "tournament_size")
+
+
+def solve(snapshot: Snapshot, engine: str = "ga", seed: Optional[int] = None, **options) -> dict:
+    """Run one solve over a snapshot and return the result with timing stats."""
+    if seed is not None:
+        random.seed(seed)
+
+    t0 = time.perf_counter()
+    generator = ENGINES[engine](**snapshot.generator_kwargs())
+    for name, value in options.items():
+        if value is not None:
+            setattr(generator, name, value)
+    t1 = time.perf_counter()
+    best = generator.run()
+    t2 = time.perf_counter()
+
+    hard = [c for c in best.conflicts if c.startswith("Hard:")]
+    return {
+        "engine": engine,
+        "seed": seed,
+        "options": {name: getattr(generator, name, None) for name in GA_OPTIONS},
+        "fitness": best.fitness,
+        "hard_conflicts": len(hard),
+        "soft_conflicts": len(best.conflicts) - len(hard),
+        "conflicts": best.conflicts,
+        "stats": {
+            "sessions": len(best.genes),
+            "generations_run": getattr(generator, "generations_run", None),
+            "setup_seconds": round(t1 - t0, 6),
+            "solve_seconds": round(t2 - t1, 6),
+        },
+        "genes": [
+            {
+                "course_id": g.course_id,
+                "faculty_id": g.faculty_id,
+                "room_id": g.room_id,
+                "batch_id": g.batch_id,
+                "section_id": g.section_id,
+                "day": g.day,
+                "period": g.period,
+                "is_practical": g.is_practical,
+            }
+            for g in best.genes
+        ],
+    }
+
+
+def _cmd_solve(args: argparse.Namespace) -> int:
+    t0 = time.perf_counter()
+    snapshot = load_snapshot(args.snapshot)
+    load_seconds = time.perf_counter() - t0
+
+    options = {name: getattr(args, name) for name in GA_OPTIONS}
+    runs = []
+    for i in range(args.runs):
+        seed = args.seed + i if args.seed is not None else None
+        result = solve(snapshot, engine=args.engine, seed=seed, **options)
+        result["stats"]["load_seconds"] = round(load_seconds, 6)
+        runs.append(result)
+        print(
+            f"run {i + 1}/{args.runs}: fitness={result['fitness']} "
+            f"hard={result['hard_conflicts']} soft={result['soft_conflicts']} "
+            f"generations={result['stats']['generations_run']} "
+            f"solve={result['stats']['solve_seconds']:.3f}s",
+            file=sys.stderr,
+        )
+
+    output = runs[0] if len(runs) == 1 else {"runs": runs}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(output, fh, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0 if all(r["hard_conflicts"] == 0 for r in runs) else 1
+
+
+async def _export(args: argparse.Namespace) -> Snapshot:
+    from app.db.init_db import init_db
+    from app.services.snapshot import export_snapshot
+
+    await init_db()
+    return await export_snapshot(
+        program_id=args.program_id,
+        batch_id=args.batch_id,
+        semester_id=args.semester_id,
+        section_ids=args.section_ids,
+    )
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    snapshot = asyncio.run(_export(args))
+    save_snapshot(snapshot, args.snapshot)
+    print(
+        f"exported {len(snapshot.courses)} courses, {len(snapshot.faculty)} faculty, "
+        f"{len(snapshot.rooms)} rooms, {len(snapshot.batches)} batches, "
+        f"{len(snapshot.sections)} sections to {args.snapshot}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+async def _check_indexes() -> list:
+    from app.db.init_db import init_db
+    from app.db.query_plans import explain_hot_queries
+
+    database = await init_db()
+    return await explain_hot_queries(database)
+
+
+def _cmd_check_indexes(args: argparse.Namespace) -> int:
+    results = asyncio.run(_check_indexes())
+    for r in results:
+        status = "ok  " if r["uses_index"] else "SCAN"
+        print(f"{status} {r['collection']:<17} {r['query']}  [{' > '.join(r['stages'])}]")
+    return 0 if all(r["uses_index"] for r in results) else 1
+
+
+def _synthetic_timetable(i: int, entries: int) -> dict:
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+    return {
+        "id": f"{i:024x}",
+        "program_id": "p" * 24, "batch_id": "b" * 24, "semester_id": "s" * 24, "section_id": "",
+        "program_name": "B.Tech Computer Science", "batch_name": "2024-2028",
+        "semester_name": "3", "section_name": "",
+        "entries": [
+            {
+                "entry_id": f"{i:08x}-{j:027x}",
+                "day": days[j % len(days)],
+                "period": j % 8 + 1,
+                "course_id": f"{j % 40:024x}", "course_name": f"Course {j % 40}",
+                "faculty_id": f"{j % 25:024x}", "faculty_name": f"Faculty Member {j % 25}",
+                "room_id": f"{j % 15:024x}", "room_name": f"Room {j % 15}",
+                "batch_id": "b" * 24, "section_id": "", "section_name": "",
+            }
+            for j in range(entries)
+        ],
+        "entry_count": entries,
+        "is_draft": False,
+        "version": 3,
+    }
+
+
+def bench_serialize(timetables: int, entries: int, repeat: int) -> List[dict]:
+    """
+    Time encoding a ``GET /timetables/`` payload three ways: FastAPI's classic
+    path (re-validate against the response model, ``jsonable_encoder``, stdlib
+    ``json``), its current one (re-validate, pydantic ``dump_json``) and
+    ``app.api.responses.dumps`` on the already-shaped dicts.
+    """
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+
+    from app.api.responses import dumps, orjson
+    from app.schemas.timetable import TimetableOut
+
+    payload = [_synthetic_timetable(i, entries) for i in range(timetables)]
+    adapter = TypeAdapter(List[TimetableOut])
+
+    def classic() -> bytes:
+        data = jsonable_encoder(adapter.validate_python(payload))
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    paths = [
+        ("validate + jsonable_encoder + json", classic),
+        ("validate + pydantic dump_json", lambda: adapter.dump_json(adapter.validate_python(payload))),
+        (f"direct ({'orjson' if orjson else 'json'})", lambda: dumps(payload)),
+    ]
+    results = []
+    for name, encode in paths:
+        walls, cpus = [], []
+        for _ in range(repeat):
+            w0, c0 = time.perf_counter(), time.process_time()
+            body = encode()
+            walls.append(time.perf_counter() - w0)
+            cpus.append(time.process_time() - c0)
+        results.append({
+            "path": name,
+            "bytes": len(body),
+            "wall_ms": round(sorted(walls)[len(walls) // 2] * 1000, 2),
+            "cpu_ms": round(sorted(cpus)[len(cpus) // 2] * 1000, 2),
+        })
+    return results
+
+
+def _cmd_bench_serialize(args: argparse.Namespace) -> int:
+    results = bench_serialize(args.timetables, args.entries, args.repeat)
+    print(f"{args.timetables} timetables x {args.entries} entries, median of {args.repeat} runs")
+    base = results[0]["wall_ms"] or 1
+    for r in results:
+        print(
+            f"{r['path']:<38} wall={r['wall_ms']:>9.2f}ms cpu={r['cpu_ms']:>9.2f}ms "
+            f"x{base / (r['wall_ms'] or 1):>5.1f}  {r['bytes']} bytes"
+        )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Offline timetable solver tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_solve = sub.add_parser("solve", help="Solve a snapshot file (.json or .parquet) without MongoDB.")
+    p_solve.add_argument("snapshot", help="Path to the snapshot file.")
+    p_solve.add_argument("--out", help="Write the result JSON here instead of stdout.")
+    p_solve.add_argument("--engine", choices=sorted(ENGINES), default="ga")
+    p_solve.add_argument("--seed", type=int, default=None, help="Random seed (incremented per run).")
+    p_solve.add_argument("--runs", type=int, default=1, help="Number of independent solves.")
+    p_solve.add_argument("--population-size", dest="population_size", type=int)
+    p_solve.add_argument("--generations", type=int)
+    p_solve.add_argument("--mutation-rate", dest="mutation_rate", type=float)
+    p_solve.add_argument("--elite-size", dest="elite_size", type=int)
+    p_solve.add_argument("--tournament-size", dest="tournament_size", type=int)
+    p_solve.set_defaults(func=_cmd_solve)
+
+    p_export = sub.add_parser("export", help="Dump a snapshot from the live database.")
+    p_export.add_argument("snapshot", help="Destination file (.json or .parquet).")
+    p_export.add_argument("--program-id")
+    p_export.add_argument("--batch-id")
+    p_export.add_argument("--semester-id")
+    p_export.add_argument("--section-id", dest="section_ids", action="append")
+    p_export.set_defaults(func=_cmd_export)
+
+    p_check = sub.add_parser("check-indexes", help="Fail unless every hot query plans an index scan.")
+    p_check.set_defaults(func=_cmd_check_indexes)
+
+    p_bench = sub.add_parser("bench-serialize", help="Compare JSON encoding paths for timetable listings.")
+    p_bench.add_argument("--timetables", type=int, default=50)
+    p_bench.add_argument("--entries", type=int, default=300, help="Entries per timetable.")
+    p_bench.add_argument("--repeat", type=int, default=7)
+    p_bench.set_defaults(func=_cmd_bench_serialize)
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,9 +7,17 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Verified token -> user cache used by get_current_user
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    # bcrypt runs on its own thread pool; beyond MAX_PENDING queued calls, logins get a 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
     MONGODB_URI: str
     MONGODB_DB: str = "timetable_db"
     GROQ_API_KEY: str = ""
+    # Watch MongoDB change streams to keep per-worker caches in sync (needs a replica set)
+    CHANGE_STREAMS_ENABLED: bool = True
     
     BACKEND_CORS_ORIGINS: List[str] = []
 
@@ -0,0 +1,84 @@
+"""
+Cache of verified access tokens -> the user they authenticate.
+
+``deps.get_current_user`` would otherwise decode the JWT and read the user
+from MongoDB on every request. Entries live for at most ``ttl`` seconds (and
+never past the token's own expiry); the least recently used are evicted past
+``max_entries``. Call ``invalidate_user`` whenever a user is deleted,
+deactivated or changes role.
+
+Cached users are shared between requests: treat them as read-only.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.models.users import User
+
+
+class PrincipalCache:
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[User]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        user, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._drop(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def put(self, token: str, user: User, token_exp: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, time.monotonic() + (token_exp - time.time()))
+        self._entries[token] = (user, expires_at)
+        self._entries.move_to_end(token)
+        self._tokens_by_user.setdefault(str(user.id), set()).add(token)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def _drop(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        uid = str(entry[0].id)
+        tokens = self._tokens_by_user.get(uid)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[uid]
+
+    def invalidate_user(self, user_id) -> None:
+        for token in list(self._tokens_by_user.get(str(user_id), ())):
+            self._drop(token)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl_seconds": self.ttl,
+            "max_entries": self.max_entries,
+        }
+
+
+principals = PrincipalCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
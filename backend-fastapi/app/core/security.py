@@ -1,5 +1,7 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Dict, List, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -22,3 +24,64 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+# ─── Off-loop hashing ───
+# bcrypt takes 100-300 ms per call, so async handlers must not run it on the
+# event loop. Calls go to a dedicated pool; when too many are already queued
+# the caller gets PasswordHashingBusy (served as a 503) instead of waiting.
+
+class PasswordHashingBusy(RuntimeError):
+    pass
+
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
+_hash_stats = {"pending": 0, "completed": 0, "rejected": 0}
+
+
+async def _run_hashing(fn, *args):
+    if _hash_stats["pending"] >= settings.PASSWORD_HASH_MAX_PENDING:
+        _hash_stats["rejected"] += 1
+        raise PasswordHashingBusy("Password hashing is saturated; retry shortly.")
+    _hash_stats["pending"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_stats["pending"] -= 1
+        _hash_stats["completed"] += 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
+
+
+async def get_password_hashes(passwords: List[str]) -> List[str]:
+    """
+    Hash many passwords across the pool. At most one call per worker is queued
+    at a time, so a bulk import never fills the queue ahead of logins.
+    """
+    limit = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+
+    async def one(password: str) -> str:
+        async with limit:
+            while True:
+                try:
+                    return await get_password_hash_async(password)
+                except PasswordHashingBusy:
+                    await asyncio.sleep(0.05)
+
+    return await asyncio.gather(*(one(p) for p in passwords))
+
+
+def hashing_stats() -> Dict[str, int]:
+    return {
+        **_hash_stats,
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+    }
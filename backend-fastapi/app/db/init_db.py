@@ -7,11 +7,18 @@ from app.models.courses import Course
 from app.models.faculty import Faculty
 from app.models.infrastructure import Room
 from app.models.timetable import Timetable, ScheduleConfig
+from app.models.student import Student
 
 async def init_db():
+    """
+    Connect and register the document models. Beanie creates every index
+    declared in the models' ``Settings`` (createIndexes is a no-op for indexes
+    that already exist), so this is safe to run on every startup.
+    """
     client = AsyncIOMotorClient(settings.MONGODB_URI)
+    database = client[settings.MONGODB_DB]
     await init_beanie(
-        database=client[settings.MONGODB_DB],
+        database=database,
         document_models=[
             User,
             Program,
@@ -23,5 +30,7 @@ async def init_db():
             Room,
             Timetable,
             ScheduleConfig,
+            Student,
         ],
     )
+    return database
@@ -0,0 +1,59 @@
+"""
+Query-plan checks for the hot read paths.
+
+``explain_hot_queries`` runs ``explain`` on each representative query and
+reports whether the winning plan is an index scan. It backs
+``python -m app.cli check-indexes``, which exits non-zero on any COLLSCAN.
+"""
+
+from typing import Any, Dict, List
+
+from bson import ObjectId
+
+_SAMPLE_ID = ObjectId("000000000000000000000000")
+
+# (label, collection, filter, sort)
+HOT_QUERIES = [
+    ("courses by program+semester (generate)", "courses",
+     {"program.$id": _SAMPLE_ID, "semester.$id": _SAMPLE_ID}, None),
+    ("schedule config by semester", "schedule_configs", {"semester.$id": _SAMPLE_ID}, None),
+    ("faculty by email (/faculty/me/timetable)", "faculty", {"email": "someone@example.com"}, None),
+    ("timetables by program+semester", "timetables",
+     {"program.$id": _SAMPLE_ID, "semester.$id": _SAMPLE_ID}, {"_id": 1}),
+    ("timetables by batch+semester+section", "timetables",
+     {"batch.$id": _SAMPLE_ID, "semester.$id": _SAMPLE_ID, "section.$id": _SAMPLE_ID}, {"_id": 1}),
+    ("timetables by section", "timetables", {"section.$id": _SAMPLE_ID}, {"_id": 1}),
+    ("timetables by faculty entry", "timetables", {"entries.faculty_id": str(_SAMPLE_ID)}, None),
+    ("timetables by room entry", "timetables", {"entries.room_id": str(_SAMPLE_ID)}, None),
+    ("students by batch (electives)", "students", {"batch.$id": _SAMPLE_ID}, None),
+    ("rooms by type (keyset page)", "rooms", {"type": "Lab", "_id": {"$gt": _SAMPLE_ID}}, {"_id": 1}),
+    ("rooms by feature (keyset page)", "rooms",
+     {"features": {"$all": ["Projector"]}, "_id": {"$gt": _SAMPLE_ID}}, {"_id": 1}),
+]
+
+
+def _stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get("stage", "")]
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            stages += _stages(plan[key])
+    for child in plan.get("inputStages", []) or []:
+        stages += _stages(child)
+    return stages
+
+
+async def explain_hot_queries(database) -> List[Dict[str, Any]]:
+    results = []
+    for label, collection, query, sort in HOT_QUERIES:
+        find: Dict[str, Any] = {"find": collection, "filter": query}
+        if sort:
+            find["sort"] = sort
+        explained = await database.command({"explain": find, "verbosity": "queryPlanner"})
+        stages = _stages(explained["queryPlanner"]["winningPlan"])
+        results.append({
+            "query": label,
+            "collection": collection,
+            "stages": stages,
+            "uses_index": "IXSCAN" in stages and "COLLSCAN" not in stages,
+        })
+    return results
@@ -1,14 +1,20 @@
 from typing import Optional, List
-from beanie import Document, Link
+from beanie import Link
 from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
+from pymongo.collation import Collation
 from app.models.programs import Program, Semester
+from app.models.versioned import Versioned
+
+# Case-insensitive comparison for course code lookups (strength 2 ignores case)
+CODE_COLLATION = Collation(locale="en", strength=2)
 
 class CourseComponent(BaseModel):
     lecture: int = 0
     tutorial: int = 0
     practical: int = 0
 
-class Course(Document):
+class Course(Versioned):
     code: str  # e.g., "CS101"
     name: str
     credits: int
@@ -19,6 +25,15 @@ class Course(Document):
     program: Optional[Link[Program]] = None
     semester: Optional[Link[Semester]] = None
     is_elective: bool = False
+    required_features: List[str] = []  # room features needed, e.g. "Projector", "Computers"
     
     class Settings:
         name = "courses"
+        indexes = [
+            IndexModel([("program.$id", ASCENDING), ("semester.$id", ASCENDING)]),
+            IndexModel([("semester.$id", ASCENDING)]),
+            IndexModel([("code", ASCENDING)], name="code_ci", collation=CODE_COLLATION),
+            # Listing filters + keyset pagination on _id
+            IndexModel([("type", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("is_elective", ASCENDING), ("_id", ASCENDING)]),
+        ]
@@ -1,13 +1,16 @@
 from typing import List, Optional
-from beanie import Document, Link
+from beanie import Link
 from pydantic import BaseModel, EmailStr, Field
+from pymongo import ASCENDING, IndexModel
 from app.models.courses import Course
+from app.models.users import EMAIL_COLLATION
+from app.models.versioned import Versioned
 
 class TimeSlot(BaseModel):
     day: str # "Monday", "Tuesday", etc.
     periods: List[int] # [1, 2, 3]
 
-class Faculty(Document):
+class Faculty(Versioned):
     name: str
     email: EmailStr
     department: str
@@ -25,3 +28,9 @@ class Faculty(Document):
     
     class Settings:
         name = "faculty"
+        indexes = [
+            IndexModel([("email", ASCENDING)]),
+            IndexModel([("email", ASCENDING)], name="email_ci", collation=EMAIL_COLLATION),
+            IndexModel([("can_teach.$id", ASCENDING)]),
+            IndexModel([("department", ASCENDING), ("_id", ASCENDING)]),
+        ]
@@ -1,8 +1,9 @@
 from typing import Optional, List
-from beanie import Document
 from pydantic import BaseModel
+from pymongo import ASCENDING, IndexModel
+from app.models.versioned import Versioned
 
-class Room(Document):
+class Room(Versioned):
     name: str # "Room 101", "Chem Lab A"
     capacity: int
     type: str = "Lecture" # "Lecture", "Lab", "Seminar"
@@ -10,3 +11,8 @@ class Room(Document):
     
     class Settings:
         name = "rooms"
+        # Listing filters + keyset pagination on _id
+        indexes = [
+            IndexModel([("type", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("features", ASCENDING), ("_id", ASCENDING)]),
+        ]
@@ -1,8 +1,10 @@
 from typing import List, Optional
-from beanie import Document, Link
+from beanie import Link
 from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
+from app.models.versioned import Versioned
 
-class Semester(Document):
+class Semester(Versioned):
     name: str  # e.g., "Sem 1", "Sem 2"
     number: int
     is_active: bool = True
@@ -10,14 +12,14 @@ class Semester(Document):
     class Settings:
         name = "semesters"
 
-class Section(Document):
+class Section(Versioned):
     name: str  # e.g., "A", "B", "C"
     student_count: int = 0
     
     class Settings:
         name = "sections"
 
-class Batch(Document):
+class Batch(Versioned):
     name: str # e.g., "2024-2028"
     start_year: int
     end_year: int
@@ -26,8 +28,9 @@ class Batch(Document):
     
     class Settings:
         name = "batches"
+        indexes = [IndexModel([("sections.$id", ASCENDING)])]
 
-class Program(Document):
+class Program(Versioned):
     name: str # e.g., "B.Tech Computer Science", "B.Ed"
     code: str # e.g., "BTCS", "BED"
     type: str # "UG", "PG", "FYUP", "ITE"
@@ -36,3 +39,4 @@ class Program(Document):
     
     class Settings:
         name = "programs"
+        indexes = [IndexModel([("batches.$id", ASCENDING)])]
@@ -1,6 +1,7 @@
 from typing import List, Optional
 from beanie import Document, Link
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 from app.models.programs import Batch
 from app.models.courses import Course
@@ -15,3 +16,7 @@ class Student(Document):
     
     class Settings:
         name = "students"
+        indexes = [
+            IndexModel([("student_id", ASCENDING)], unique=True),
+            IndexModel([("batch.$id", ASCENDING)]),
+        ]
@@ -1,6 +1,7 @@
-from typing import List, Optional, Any
-from beanie import Document, Link
-from pydantic import BaseModel
+from typing import Dict, List, Optional, Any
+from beanie import Document, Link, PydanticObjectId
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
 from datetime import datetime
 from app.models.programs import Program, Batch, Semester, Section
 
@@ -26,9 +27,14 @@ class ScheduleConfig(Document):
     working_days: List[str] = [
         "Monday", "Tuesday", "Wednesday", "Thursday", "Friday"
     ]
+    # Generator scoring: overrides for constraint weights (see app.services.constraints)
+    # and constraints switched off for this institution/semester.
+    constraint_weights: Dict[str, float] = {}
+    disabled_constraints: List[str] = []
 
     class Settings:
         name = "schedule_configs"
+        indexes = [IndexModel([("semester.$id", ASCENDING)])]
 
 
 class TimetableEntry(BaseModel):
@@ -56,6 +62,42 @@ class Timetable(Document):
 
     is_draft: bool = True
     created_at: datetime = datetime.utcnow()
+    # Bumped on every edit; writes are guarded on it (optimistic concurrency)
+    version: int = 0
 
     class Settings:
         name = "timetables"
+        # Listing filters + keyset pagination on _id
+        indexes = [
+            IndexModel([("program.$id", ASCENDING), ("semester.$id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("batch.$id", ASCENDING), ("semester.$id", ASCENDING), ("section.$id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("section.$id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("is_draft", ASCENDING), ("_id", ASCENDING)]),
+            # Multikey: per-faculty / per-room lookups across all timetables
+            IndexModel([("entries.faculty_id", ASCENDING)]),
+            IndexModel([("entries.room_id", ASCENDING)]),
+        ]
+
+
+class TimetableSummary(BaseModel):
+    """Projection of a timetable without its entries (computed server-side)."""
+    id: PydanticObjectId = Field(alias="_id")
+    program: Optional[Any] = None
+    batch: Optional[Any] = None
+    semester: Optional[Any] = None
+    section: Optional[Any] = None
+    is_draft: bool = True
+    version: int = 0
+    entry_count: int = 0
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "program": 1,
+            "batch": 1,
+            "semester": 1,
+            "section": 1,
+            "is_draft": 1,
+            "version": 1,
+            "entry_count": {"$size": {"$ifNull": ["$entries", []]}},
+        }
@@ -1,8 +1,13 @@
 from typing import Optional, List
 from beanie import Document, Indexed
 from pydantic import EmailStr, Field
+from pymongo import ASCENDING, IndexModel
+from pymongo.collation import Collation
 from datetime import datetime
 
+# Case-insensitive comparison for email lookups (strength 2 ignores case)
+EMAIL_COLLATION = Collation(locale="en", strength=2)
+
 class User(Document):
     email: Indexed(EmailStr, unique=True)
     hashed_password: str
@@ -13,3 +18,4 @@ class User(Document):
 
     class Settings:
         name = "users"
+        indexes = [IndexModel([("email", ASCENDING)], name="email_ci", collation=EMAIL_COLLATION)]
@@ -0,0 +1,20 @@
+from beanie import Document, PydanticObjectId, Replace, Save, SaveChanges, before_event
+from pydantic import BaseModel, Field
+
+
+class Versioned(Document):
+    """
+    Document with a ``version`` bumped on every whole-document save. Query
+    updates (``find(...).update``) bypass this and must ``$inc`` it themselves.
+    """
+    version: int = 0
+
+    @before_event(Replace, Save, SaveChanges)
+    def _bump_version(self):
+        self.version += 1
+
+
+class VersionView(BaseModel):
+    """Projection of any document to its id and version, for conditional GETs."""
+    id: PydanticObjectId = Field(alias="_id")
+    version: int = 0
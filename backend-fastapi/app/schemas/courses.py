@@ -11,6 +11,7 @@ class CourseCreate(BaseModel):
     program_id: Optional[str] = None
     semester_id: Optional[str] = None
     is_elective: bool = False
+    required_features: List[str] = []
 
 class CourseOut(CourseCreate):
     id: str
@@ -0,0 +1,10 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class BulkImportResponse(BaseModel):
+    total_records: int
+    successfully_created: int
+    failed: int
+    errors: list = []    # [{"row": 5, "errors": ["..."]}]
+    created: List[dict] = []  # [{"row": 2, "id": "...", ...}]
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+class SearchHitOut(BaseModel):
+    type: str  # "course", "faculty" or "room"
+    id: str
+    label: str
+    sublabel: str
@@ -1,4 +1,4 @@
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any
 from pydantic import BaseModel
 from beanie.odm.fields import PydanticObjectId
 from app.models.faculty import Faculty
@@ -13,9 +13,22 @@ class TimetableEntryUpdate(BaseModel):
     period: int
     room_id: PydanticObjectId
 
+class EntrySwap(BaseModel):
+    entry_id_a: str
+    entry_id_b: str
+
 class TimetableUpdateRequest(BaseModel):
-    action: str # "move_entry"
-    payload: TimetableEntryUpdate
+    action: str # "move_entry", "batch_move" or "swap_entries"
+    payload: Optional[TimetableEntryUpdate] = None  # move_entry
+    moves: List[TimetableEntryUpdate] = []          # batch_move
+    swap: Optional[EntrySwap] = None                # swap_entries
+    version: Optional[int] = None  # Version the client last saw; stale edits get a 409
+
+class CandidateSlotOut(BaseModel):
+    day: str
+    period: int
+    room_id: str
+    room_name: str
 
 class TimetableGenerateRequest(BaseModel):
     program_id: PydanticObjectId
@@ -48,7 +61,9 @@ class TimetableOut(BaseModel):
     semester_name: str = ""
     section_name: str = ""
     entries: List[TimetableEntryOut] = []
+    entry_count: int = 0
     is_draft: bool = True
+    version: int = 0
 
     class Config:
         from_attributes = True
@@ -80,6 +95,8 @@ class ScheduleConfigCreate(BaseModel):
     working_days: List[str] = [
         "Monday", "Tuesday", "Wednesday", "Thursday", "Friday"
     ]
+    constraint_weights: Dict[str, float] = {}
+    disabled_constraints: List[str] = []
 
 class ScheduleConfigOut(BaseModel):
     id: str
@@ -91,3 +108,11 @@ class ScheduleConfigOut(BaseModel):
     periods_per_day: int
     breaks: List[BreakSlotSchema] = []
     working_days: List[str] = []
+    constraint_weights: Dict[str, float] = {}
+    disabled_constraints: List[str] = []
+
+class ConstraintOut(BaseModel):
+    name: str
+    kind: str  # "Hard" or "Soft"
+    default_weight: float
+    description: str = ""
@@ -0,0 +1,183 @@
+"""
+Cascading deletes for the program hierarchy, and replacement of regenerated
+timetables.
+
+Each cascade first collects the ids of everything that hangs off the deleted
+document, then removes it all with ``delete_many`` / ``$pull`` updates inside
+one transaction (when the server supports them; a standalone server runs the
+same operations without one). Afterwards the occupancy index, collection
+versions (which also drop the reference-data cache) and faculty load are
+brought up to date.
+
+Links are stored as DBRefs, so links are matched with ``field.$id`` in
+queries and pulled from arrays by their full DBRef value.
+"""
+
+import inspect
+import logging
+from typing import Awaitable, Callable, Dict, List
+
+from beanie import PydanticObjectId
+from bson import DBRef
+from pydantic import BaseModel, Field
+from pymongo.errors import OperationFailure
+
+from app.models.courses import Course
+from app.models.faculty import Faculty
+from app.models.programs import Program, Batch, Semester, Section
+from app.models.timetable import Timetable, ScheduleConfig
+from app.services.occupancy import occupancy
+from app.services.resolver import extract_link_id
+from app.services.versions import record_write
+from app.services.workload import refresh_faculty_load
+
+logger = logging.getLogger(__name__)
+
+# "Transaction numbers are only allowed on a replica set member or mongos"
+_NO_TRANSACTIONS = {20}
+
+
+class _IdView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+
+
+class _SectionLinks(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    sections: list = []
+
+
+def _ref_ids(refs) -> List[PydanticObjectId]:
+    return [PydanticObjectId(rid) for rid in (extract_link_id(ref) for ref in refs or []) if rid]
+
+
+async def _ids(model, query: dict) -> List[PydanticObjectId]:
+    return [d.id for d in await model.find(query).project(_IdView).to_list()]
+
+
+async def _in_transaction(work: Callable[[object], Awaitable[None]]) -> None:
+    """Run ``work(session)`` in a transaction, or with no session on a standalone server."""
+    client = Program.get_pymongo_collection().database.client
+    session = client.start_session()
+    if inspect.isawaitable(session):
+        session = await session
+    try:
+        async with session:
+            await session.with_transaction(work)
+    except OperationFailure as e:
+        if e.code not in _NO_TRANSACTIONS:
+            raise
+        logger.info("Transactions unavailable; running cascade without one.")
+        await work(None)
+
+
+async def _after_delete(timetable_ids: List[PydanticObjectId], *collections: str) -> None:
+    for tid in timetable_ids:
+        occupancy.remove_timetable(str(tid))
+    await record_write(*collections, *(["timetables"] if timetable_ids else []))
+    if timetable_ids:
+        await refresh_faculty_load()
+
+
+async def replace_timetables(superseded: List[PydanticObjectId], timetables: List[Timetable]) -> None:
+    """
+    Save freshly generated timetables in place of the ones they supersede
+    (same batch, semester and section), in one transaction, then bring the
+    occupancy index, collection versions and faculty load up to date.
+    """
+    async def work(session):
+        if superseded:
+            await Timetable.find({"_id": {"$in": superseded}}).delete(session=session)
+        for t in timetables:
+            await t.insert(session=session)
+
+    await _in_transaction(work)
+    for tid in superseded:
+        occupancy.remove_timetable(str(tid))
+    for t in timetables:
+        occupancy.index_timetable(t)
+    await record_write("timetables")
+    await refresh_faculty_load()
+
+
+async def delete_program_cascade(program: Program) -> Dict[str, int]:
+    """Delete a program with its batches, their sections, its courses and timetables."""
+    batch_ids = _ref_ids(program.batches)
+    section_ids = [
+        sid
+        for b in await Batch.find({"_id": {"$in": batch_ids}}).project(_SectionLinks).to_list()
+        for sid in _ref_ids(b.sections)
+    ]
+    course_ids = await _ids(Course, {"program.$id": program.id})
+    timetable_ids = await _ids(Timetable, {"$or": [
+        {"program.$id": program.id}, {"batch.$id": {"$in": batch_ids}},
+    ]})
+
+    async def work(session):
+        await Timetable.find({"_id": {"$in": timetable_ids}}).delete(session=session)
+        if course_ids:
+            await Faculty.find({"can_teach.$id": {"$in": course_ids}}).update(
+                {"$pull": {"can_teach": {"$in": [DBRef("courses", c) for c in course_ids]}}, "$inc": {"version": 1}},
+                session=session,
+            )
+        await Course.find({"_id": {"$in": course_ids}}).delete(session=session)
+        await Section.find({"_id": {"$in": section_ids}}).delete(session=session)
+        await Batch.find({"_id": {"$in": batch_ids}}).delete(session=session)
+        await Program.find({"_id": program.id}).delete(session=session)
+
+    await _in_transaction(work)
+    await _after_delete(timetable_ids, "programs", "batches", "sections", "courses", "faculty")
+    return {
+        "batches": len(batch_ids),
+        "sections": len(section_ids),
+        "courses": len(course_ids),
+        "timetables": len(timetable_ids),
+    }
+
+
+async def delete_batch_cascade(batch: Batch) -> Dict[str, int]:
+    """Delete a batch with its sections and timetables and unlink it from its program."""
+    section_ids = _ref_ids(batch.sections)
+    timetable_ids = await _ids(Timetable, {"batch.$id": batch.id})
+
+    async def work(session):
+        await Timetable.find({"_id": {"$in": timetable_ids}}).delete(session=session)
+        await Section.find({"_id": {"$in": section_ids}}).delete(session=session)
+        await Program.find({"batches.$id": batch.id}).update(
+            {"$pull": {"batches": DBRef("batches", batch.id)}, "$inc": {"version": 1}}, session=session
+        )
+        await Batch.find({"_id": batch.id}).delete(session=session)
+
+    await _in_transaction(work)
+    await _after_delete(timetable_ids, "programs", "batches", "sections")
+    return {"sections": len(section_ids), "timetables": len(timetable_ids)}
+
+
+async def delete_section_cascade(section: Section) -> Dict[str, int]:
+    """Delete a section with its timetables and unlink it from its batch."""
+    timetable_ids = await _ids(Timetable, {"section.$id": section.id})
+
+    async def work(session):
+        await Timetable.find({"_id": {"$in": timetable_ids}}).delete(session=session)
+        await Batch.find({"sections.$id": section.id}).update(
+            {"$pull": {"sections": DBRef("sections", section.id)}, "$inc": {"version": 1}}, session=session
+        )
+        await Section.find({"_id": section.id}).delete(session=session)
+
+    await _in_transaction(work)
+    await _after_delete(timetable_ids, "batches", "sections")
+    return {"timetables": len(timetable_ids)}
+
+
+async def delete_semester_cascade(semester: Semester) -> Dict[str, int]:
+    """Delete a semester with its schedule configs and timetables."""
+    config_ids = await _ids(ScheduleConfig, {"semester.$id": semester.id})
+    timetable_ids = await _ids(Timetable, {"semester.$id": semester.id})
+
+    async def work(session):
+        await Timetable.find({"_id": {"$in": timetable_ids}}).delete(session=session)
+        await ScheduleConfig.find({"_id": {"$in": config_ids}}).delete(session=session)
+        await Semester.find({"_id": semester.id}).delete(session=session)
+
+    await _in_transaction(work)
+    await _after_delete(timetable_ids, "semesters", *(["schedule_configs"] if config_ids else []))
+    return {"schedule_configs": len(config_ids), "timetables": len(timetable_ids)}
@@ -0,0 +1,172 @@
+"""
+Cross-worker cache invalidation from MongoDB change streams.
+
+Each worker keeps its own reference-data cache and occupancy index. A
+background task started in the lifespan watches the collections they are
+built from and keeps them in step with writes made by any worker:
+
+  * timetables        – the occupancy index is patched per document
+  * reference data    – the affected cached collection is invalidated
+  * users             – cached logins of the changed user are dropped
+  * everything else   – only counted (``stats()``)
+
+The last processed resume token is stored in the ``change_stream_state``
+collection so a restarted worker picks up where the feed left off. If the
+token has fallen off the oplog, the caches are rebuilt from scratch instead.
+
+Change streams need a replica set (a single-node one is enough). On a
+standalone server the task logs a warning and exits; caches then rely on
+their TTLs and on the invalidation done by the endpoints of the same worker.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from beanie.odm.utils.parsing import parse_obj
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.principal_cache import principals
+from app.models.timetable import Timetable
+from app.services.occupancy import occupancy
+from app.services.refdata import reference_data
+
+logger = logging.getLogger(__name__)
+
+# Collection name -> reference_data cache it backs (None: no local cache yet)
+WATCHED: Dict[str, Optional[str]] = {
+    "programs": "programs",
+    "batches": "batches",
+    "semesters": "semesters",
+    "sections": "sections",
+    "rooms": "rooms",
+    "faculty": "faculty",
+    "courses": "courses",
+    "schedule_configs": None,
+    "timetables": None,
+    "users": None,
+}
+
+STATE_COLLECTION = "change_stream_state"
+STATE_ID = "cache-invalidation"
+TOKEN_SAVE_INTERVAL = 2.0  # seconds between resume-token writes
+RETRY_DELAY = 5.0
+
+# Server error codes meaning the stream can't be resumed from the stored token
+_HISTORY_LOST = {136, 280, 286}
+# "$changeStream is only supported on replica sets"
+_NOT_REPLICA_SET = {40573}
+
+
+class ChangeFeed:
+    def __init__(self):
+        self.events: Dict[str, int] = {name: 0 for name in WATCHED}
+        self.resumed = False
+        self.running = False
+        self._token: Any = None
+        self._token_saved_at = 0.0
+
+    # ─── Resume token ───
+
+    async def _load_token(self, database) -> Any:
+        state = await database[STATE_COLLECTION].find_one({"_id": STATE_ID})
+        return state.get("resume_token") if state else None
+
+    async def _save_token(self, database, force: bool = False) -> None:
+        if self._token is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._token_saved_at < TOKEN_SAVE_INTERVAL:
+            return
+        await database[STATE_COLLECTION].update_one(
+            {"_id": STATE_ID}, {"$set": {"resume_token": self._token}}, upsert=True
+        )
+        self._token_saved_at = now
+
+    # ─── Event handling ───
+
+    async def apply(self, change: Dict[str, Any]) -> None:
+        """Update the local caches for one change event."""
+        op = change.get("operationType")
+        coll = (change.get("ns") or {}).get("coll")
+        if op in ("drop", "dropDatabase", "rename"):
+            await self.rebuild()
+            return
+        if coll not in WATCHED:
+            return
+        self.events[coll] += 1
+
+        if coll == "timetables":
+            doc_id = str((change.get("documentKey") or {}).get("_id"))
+            full = change.get("fullDocument")
+            if op == "delete" or full is None:
+                occupancy.remove_timetable(doc_id)
+            else:
+                occupancy.index_timetable(parse_obj(Timetable, full))
+            return
+
+        if coll == "users":
+            principals.invalidate_user((change.get("documentKey") or {}).get("_id"))
+            return
+
+        cache = WATCHED[coll]
+        if cache:
+            reference_data.invalidate(cache)
+
+    async def rebuild(self) -> None:
+        """Drop everything cached locally and reload it."""
+        reference_data.invalidate()
+        principals.clear()
+        await occupancy.load()
+
+    # ─── Watch loop ───
+
+    async def _watch_once(self, database) -> None:
+        pipeline = [{"$match": {"ns.coll": {"$in": list(WATCHED)}}}]
+        stream = database.watch(
+            pipeline, full_document="updateLookup", resume_after=self._token
+        )
+        if inspect.isawaitable(stream):
+            stream = await stream
+        async with stream:
+            self.running = True
+            async for change in stream:
+                try:
+                    await self.apply(change)
+                except Exception:
+                    logger.exception("Failed to apply change event; rebuilding caches")
+                    await self.rebuild()
+                self._token = stream.resume_token
+                await self._save_token(database)
+
+    async def run(self, database) -> None:
+        self._token = await self._load_token(database)
+        self.resumed = self._token is not None
+        while True:
+            try:
+                await self._watch_once(database)
+            except asyncio.CancelledError:
+                await self._save_token(database, force=True)
+                raise
+            except OperationFailure as e:
+                if e.code in _NOT_REPLICA_SET:
+                    logger.warning("Change streams unavailable (not a replica set); cross-worker invalidation disabled.")
+                    return
+                if e.code in _HISTORY_LOST and self._token is not None:
+                    logger.warning("Stored resume token is no longer in the oplog; rebuilding caches.")
+                    self._token = None
+                    await self.rebuild()
+                    continue
+                logger.exception("Change stream failed; retrying")
+            except PyMongoError:
+                logger.exception("Change stream failed; retrying")
+            self.running = False
+            await asyncio.sleep(RETRY_DELAY)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"running": self.running, "resumed": self.resumed, "events": dict(self.events)}
+
+
+change_feed = ChangeFeed()
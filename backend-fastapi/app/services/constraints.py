@@ -0,0 +1,300 @@
+"""
+Constraint model for the timetable generator.
+
+Every scoring rule is a ``Constraint`` registered in ``CONSTRAINTS``. A rule
+declares the shared indexes it reads (``needs``) and provides either
+
+  * ``check_gene(gen, gene, slot)`` – a per-gene test returning a conflict
+    message (or ``None``), or
+  * ``evaluate(gen, idx)`` – a whole-chromosome evaluator over the built
+    indexes, yielding ``(units, message)`` pairs.
+
+``compile_constraints`` turns the enabled set plus per-institution weights
+(``ScheduleConfig.constraint_weights`` / ``disabled_constraints``) into a
+``CompiledConstraints`` object that scores a chromosome in a single fused
+pass over its genes: each required index is built once and shared by all
+rules that need it, and disabled rules cost nothing.
+"""
+
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Slot = Tuple[str, int]
+
+HARD = "Hard"
+SOFT = "Soft"
+
+
+class Constraint:
+    def __init__(
+        self,
+        name: str,
+        weight: float,
+        kind: str = SOFT,
+        needs: Tuple[str, ...] = (),
+        check_gene: Optional[Callable] = None,
+        evaluate: Optional[Callable] = None,
+        description: str = "",
+    ):
+        self.name = name
+        self.weight = weight
+        self.kind = kind
+        self.needs = needs
+        self.check_gene = check_gene
+        self.evaluate = evaluate
+        self.description = description
+
+
+# ─── Shared indexes ───────────────────────────────────────────────
+# name -> (factory(gen), update(idx_value, gen, gene, slot))
+
+def _section_key(gene) -> str:
+    return gene.section_id or gene.batch_id
+
+
+def _new_section_days(gen):
+    return {sec["id"]: {d: [] for d in gen.days} for sec in gen.sections}
+
+
+def _update_batch_electives(value, gen, gene, slot):
+    if gene.course_id in gen.elective_clashes:
+        value.setdefault((gene.batch_id, slot), []).append(gene.course_id)
+
+
+def _update_section_days(value, gen, gene, slot):
+    days = value.get(_section_key(gene))
+    if days is not None and gene.day in days:
+        days[gene.day].append(gene.period)
+
+
+INDEXES: Dict[str, Tuple[Callable, Callable]] = {
+    "faculty_slots": (lambda gen: Counter(), lambda v, gen, g, s: v.update(((g.faculty_id, s),))),
+    "room_slots": (lambda gen: Counter(), lambda v, gen, g, s: v.update(((g.room_id, s),))),
+    "section_slots": (lambda gen: Counter(), lambda v, gen, g, s: v.update(((_section_key(g), s),))),
+    "section_days": (_new_section_days, _update_section_days),
+    "faculty_load": (lambda gen: Counter(), lambda v, gen, g, s: v.update((g.faculty_id,))),
+    "batch_electives": (lambda gen: {}, _update_batch_electives),
+}
+
+
+# ─── Evaluators ───────────────────────────────────────────────────
+
+def _clashes(counter: Counter, label: str):
+    for (resource_id, slot), count in counter.items():
+        for _ in range(count - 1):
+            yield 1, f"Hard: {label} {resource_id} clashing at {slot}"
+
+
+def _faculty_clash(gen, idx):
+    return _clashes(idx["faculty_slots"], "Faculty")
+
+
+def _room_clash(gen, idx):
+    return _clashes(idx["room_slots"], "Room")
+
+
+def _section_clash(gen, idx):
+    return _clashes(idx["section_slots"], "Section")
+
+
+def _faculty_busy(gen, gene, slot):
+    if slot in gen.faculty_busy_map.get(gene.faculty_id, ()):
+        return f"Hard: Faculty {gene.faculty_id} scheduled in busy slot {slot}"
+    return None
+
+
+def _room_booked_elsewhere(gen, gene, slot):
+    if slot in gen.room_booked_elsewhere.get(gene.room_id, ()):
+        return f"Hard: Room {gene.room_id} already booked by another timetable at {slot}"
+    return None
+
+
+def _lab_room(gen, gene, slot):
+    if not gene.is_practical:
+        return None
+    room = gen.room_map.get(gene.room_id)
+    if room and (room.type or "").lower() != "lab":
+        course = gen.course_map.get(gene.course_id)
+        cname = course.name if course else gene.course_id
+        return f"Soft: Practical {cname} in non-lab room {room.name}"
+    return None
+
+
+def _room_capacity(gen, gene, slot):
+    need = gen.section_size.get(gene.section_id, 0)
+    room = gen.room_map.get(gene.room_id)
+    if room and need and (room.capacity or 0) < need:
+        return f"Soft: Room {room.name} (capacity {room.capacity}) too small for section {gene.section_id} ({need} students)"
+    return None
+
+
+def _room_features(gen, gene, slot):
+    required = gen.course_feature_mask.get(gene.course_id, 0)
+    if required and gen.room_index.room_mask(gene.room_id) & required != required:
+        room = gen.room_map.get(gene.room_id)
+        return f"Soft: Room {room.name if room else gene.room_id} lacks features required by {gene.course_id}"
+    return None
+
+
+def _elective_clash(gen, idx):
+    matrix = gen.elective_clashes
+    for (batch_id, slot), course_ids in idx["batch_electives"].items():
+        if len(course_ids) < 2:
+            continue
+        for i in range(len(course_ids)):
+            for j in range(i + 1, len(course_ids)):
+                if matrix.overlaps(course_ids[i], course_ids[j]):
+                    yield 1, f"Hard: Electives {course_ids[i]} and {course_ids[j]} share students at {slot}"
+
+
+def _gaps(gen, idx):
+    for sid, schedule in idx["section_days"].items():
+        for day, periods in schedule.items():
+            if len(periods) < 2:
+                continue
+            periods.sort()
+            for i in range(len(periods) - 1):
+                gap = periods[i + 1] - periods[i]
+                if gap > 1:
+                    yield gap - 1, f"Soft: Batch {sid} has a {gap - 1}h gap on {day}"
+
+
+def _consecutive(gen, idx):
+    for sid, schedule in idx["section_days"].items():
+        for day, periods in schedule.items():
+            if len(periods) < 2:
+                continue
+            periods.sort()
+            consec = 1
+            for i in range(len(periods) - 1):
+                consec = consec + 1 if periods[i + 1] - periods[i] == 1 else 1
+                if consec > 4:
+                    yield 1, f"Soft: Batch {sid} has >4 consecutive classes on {day}"
+                    break
+
+
+def _day_spread(gen, idx):
+    for schedule in idx["section_days"].values():
+        counts = [len(ps) for ps in schedule.values()]
+        if not counts:
+            continue
+        avg = sum(counts) / len(counts)
+        for cnt in counts:
+            diff = abs(cnt - avg)
+            if diff > 2:
+                yield diff, None
+
+
+def _faculty_overload(gen, idx):
+    for fid, periods in idx["faculty_load"].items():
+        max_load = gen.faculty_max_load.get(fid)
+        if max_load is None:
+            continue
+        over = gen.faculty_base_load.get(fid, 0) + periods - max_load
+        if over > 0:
+            yield over, f"Soft: Faculty {fid} exceeds max load by {over}h"
+
+
+# ─── Registry ─────────────────────────────────────────────────────
+
+CONSTRAINTS: Dict[str, Constraint] = {}
+
+
+def register(constraint: Constraint) -> Constraint:
+    for name in constraint.needs:
+        if name not in INDEXES:
+            raise ValueError(f"Constraint '{constraint.name}' needs unknown index '{name}'")
+    CONSTRAINTS[constraint.name] = constraint
+    return constraint
+
+
+register(Constraint("faculty_clash", 100, HARD, ("faculty_slots",), evaluate=_faculty_clash,
+                    description="A faculty member teaches two classes at the same time."))
+register(Constraint("faculty_busy", 100, HARD, check_gene=_faculty_busy,
+                    description="A class falls in one of the faculty member's busy slots."))
+register(Constraint("room_clash", 100, HARD, ("room_slots",), evaluate=_room_clash,
+                    description="A room hosts two classes at the same time."))
+register(Constraint("room_booked_elsewhere", 100, HARD, check_gene=_room_booked_elsewhere,
+                    description="A room is already booked at that slot by another saved timetable."))
+register(Constraint("section_clash", 100, HARD, ("section_slots",), evaluate=_section_clash,
+                    description="A section attends two classes at the same time."))
+register(Constraint("elective_clash", 100, HARD, ("batch_electives",), evaluate=_elective_clash,
+                    description="Two electives chosen by the same students run at the same time."))
+register(Constraint("lab_room", 10, SOFT, check_gene=_lab_room,
+                    description="A practical session is placed in a non-lab room."))
+register(Constraint("gap_hours", 2, SOFT, ("section_days",), evaluate=_gaps,
+                    description="Idle hours between classes of a section on a day (per hour)."))
+register(Constraint("consecutive_classes", 3, SOFT, ("section_days",), evaluate=_consecutive,
+                    description="A section has more than 4 consecutive classes on a day."))
+register(Constraint("day_spread", 1, SOFT, ("section_days",), evaluate=_day_spread,
+                    description="A day's class count deviates from the section's daily average by more than 2."))
+register(Constraint("room_capacity", 20, SOFT, check_gene=_room_capacity,
+                    description="A room is smaller than the section's student count."))
+register(Constraint("room_features", 10, SOFT, check_gene=_room_features,
+                    description="A room lacks a feature the course requires."))
+register(Constraint("faculty_overload", 20, SOFT, ("faculty_load",), evaluate=_faculty_overload,
+                    description="A faculty member is assigned more than max_load_hours (per hour over)."))
+
+
+def unknown_constraints(names: Iterable[str]) -> List[str]:
+    return [n for n in names if n not in CONSTRAINTS]
+
+
+# ─── Compilation ──────────────────────────────────────────────────
+
+class CompiledConstraints:
+    def __init__(self, constraints: List[Tuple[Constraint, float]]):
+        self.constraints = constraints
+        self.weights = {c.name: w for c, w in constraints}
+        needed = sorted({name for c, _ in constraints for name in c.needs})
+        self._factories = [(name, INDEXES[name][0]) for name in needed]
+        self._updaters = [(name, INDEXES[name][1]) for name in needed]
+        self._gene_checks = [(w, c.check_gene) for c, w in constraints if c.check_gene]
+        self._evaluators = [(w, c.evaluate) for c, w in constraints if c.evaluate]
+
+    def evaluate(self, gen, genes) -> Tuple[float, List[str]]:
+        score = 0.0
+        conflicts: List[str] = []
+        idx = {name: factory(gen) for name, factory in self._factories}
+        updaters = [(idx[name], update) for name, update in self._updaters]
+        gene_checks = self._gene_checks
+
+        for gene in genes:
+            slot = (gene.day, gene.period)
+            for value, update in updaters:
+                update(value, gen, gene, slot)
+            for weight, check in gene_checks:
+                msg = check(gen, gene, slot)
+                if msg:
+                    score -= weight
+                    conflicts.append(msg)
+
+        for weight, evaluate in self._evaluators:
+            for units, msg in evaluate(gen, idx):
+                score -= weight * units
+                if msg:
+                    conflicts.append(msg)
+
+        return score, conflicts
+
+
+def compile_constraints(
+    weights: Optional[Dict[str, float]] = None,
+    disabled: Optional[Iterable[str]] = None,
+) -> CompiledConstraints:
+    """
+    Compile the enabled constraints with their effective weights.
+    ``weights`` overrides registry defaults; a weight of 0 or a name listed in
+    ``disabled`` removes the rule from evaluation entirely.
+    """
+    weights = weights or {}
+    disabled = set(disabled or ())
+    enabled = []
+    for name, constraint in CONSTRAINTS.items():
+        if name in disabled:
+            continue
+        weight = weights.get(name, constraint.weight)
+        if not weight:
+            continue
+        enabled.append((constraint, weight))
+    return CompiledConstraints(enabled)
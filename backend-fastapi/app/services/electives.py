@@ -0,0 +1,83 @@
+"""
+Student elective overlap for the timetable generator.
+
+``ElectiveClashMatrix`` is a course-vs-course matrix of how many students
+chose both courses. Counts are kept sparse (only pairs that co-occur) and
+each course also gets a bitset row over the course index, so "do these two
+electives share a student?" is a shift-and-mask instead of a scan over
+students.
+"""
+
+from itertools import combinations
+from typing import Dict, Iterable, List, Tuple
+
+from beanie import PydanticObjectId
+
+from app.models.student import Student
+from app.services.resolver import extract_link_id
+
+
+class ElectiveClashMatrix:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.rows: List[int] = []
+        self.counts: Dict[Tuple[int, int], int] = {}
+        self.students = 0
+
+    def _idx(self, course_id: str) -> int:
+        i = self.index.get(course_id)
+        if i is None:
+            i = len(self.rows)
+            self.index[course_id] = i
+            self.rows.append(0)
+        return i
+
+    def add_choices(self, course_ids: Iterable[str]) -> None:
+        """Register one student's chosen electives."""
+        ids = sorted({self._idx(str(c)) for c in course_ids if c})
+        self.students += 1
+        for i, j in combinations(ids, 2):
+            self.counts[(i, j)] = self.counts.get((i, j), 0) + 1
+            self.rows[i] |= 1 << j
+            self.rows[j] |= 1 << i
+
+    @classmethod
+    def from_choices(cls, choices: Iterable[Iterable[str]]) -> "ElectiveClashMatrix":
+        matrix = cls()
+        for course_ids in choices:
+            matrix.add_choices(course_ids)
+        return matrix
+
+    def __contains__(self, course_id: str) -> bool:
+        return course_id in self.index
+
+    def overlaps(self, a: str, b: str) -> bool:
+        i = self.index.get(a)
+        j = self.index.get(b)
+        if i is None or j is None or i == j:
+            return False
+        return bool(self.rows[i] >> j & 1)
+
+    def count(self, a: str, b: str) -> int:
+        i = self.index.get(a)
+        j = self.index.get(b)
+        if i is None or j is None or i == j:
+            return 0
+        return self.counts.get((min(i, j), max(i, j)), 0)
+
+
+async def elective_choices(batch_id: PydanticObjectId | None = None):
+    """Yield each student's chosen elective course ids, streamed in a single pass."""
+    match = {"chosen_electives.1": {"$exists": True}}
+    if batch_id is not None:
+        match["batch.$id"] = batch_id
+    pipeline = [{"$match": match}, {"$project": {"_id": 0, "chosen_electives": 1}}]
+    async for row in Student.aggregate(pipeline):
+        yield [cid for cid in (extract_link_id(r) for r in row.get("chosen_electives", [])) if cid]
+
+
+async def load_elective_matrix(batch_id: PydanticObjectId | None = None) -> ElectiveClashMatrix:
+    matrix = ElectiveClashMatrix()
+    async for course_ids in elective_choices(batch_id):
+        matrix.add_choices(course_ids)
+    return matrix
@@ -1,10 +1,14 @@
 import random
 import copy
+from collections import Counter
 from typing import List, Dict, Optional, Tuple, Set
 from app.models.courses import Course
 from app.models.faculty import Faculty
 from app.models.infrastructure import Room
 from app.models.programs import Program, Batch, Section
+from app.services.constraints import compile_constraints
+from app.services.electives import ElectiveClashMatrix
+from app.services.room_index import RoomIndex
 
 
 class Gene:
@@ -25,14 +29,16 @@ class Gene:
 
 
 class Chromosome:
-    def __init__(self, genes: List[Gene]):
+    def __init__(self, genes: List[Gene], faculty_load: Optional[Counter] = None):
         self.genes = genes
         self.fitness = 0.0
         self.conflicts: List[str] = []
+        # Periods assigned per faculty id, kept in step with gene edits
+        self.faculty_load: Counter = faculty_load if faculty_load is not None else Counter(g.faculty_id for g in genes)
 
 
 class TimetableGenerator:
-    def __init__(self, courses: List[Course], faculty: List[Faculty], rooms: List[Room], batches: List[Batch], sections: List[Section] | None = None, periods_per_day: int = 8, working_days: List[str] | None = None):
+    def __init__(self, courses: List[Course], faculty: List[Faculty], rooms: List[Room], batches: List[Batch], sections: List[Section] | None = None, periods_per_day: int = 8, working_days: List[str] | None = None, constraint_weights: Dict[str, float] | None = None, disabled_constraints: List[str] | None = None, faculty_base_load: Dict[str, int] | None = None, elective_clashes: ElectiveClashMatrix | None = None, faculty_booked_elsewhere: Dict[str, Set[Tuple[str, int]]] | None = None, room_booked_elsewhere: Dict[str, Set[Tuple[str, int]]] | None = None):
         self.courses = courses
         self.faculty = faculty
         self.rooms = rooms
@@ -57,11 +63,11 @@ class TimetableGenerator:
                             break
                     if parent_batch_id:
                         break
-                self.sections.append({"id": str(s.id), "name": s.name, "batch_id": parent_batch_id or str(batches[0].id) if batches else ""})
+                self.sections.append({"id": str(s.id), "name": s.name, "batch_id": parent_batch_id or str(batches[0].id) if batches else "", "student_count": s.student_count or 0})
         else:
             # Legacy: no sections, treat each batch as a single section
             for b in batches:
-                self.sections.append({"id": str(b.id), "name": "default", "batch_id": str(b.id)})
+                self.sections.append({"id": str(b.id), "name": "default", "batch_id": str(b.id), "student_count": 0})
 
         # ── Configurable schedule parameters ──
         self.days = working_days if working_days else ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
@@ -74,6 +80,10 @@ class TimetableGenerator:
         self.mutation_rate = 0.35
         self.elite_size = 6
         self.tournament_size = 5
+        self.generations_run = 0
+
+        # --- Scoring rules (weights configurable per ScheduleConfig) ---
+        self.constraints = compile_constraints(constraint_weights, disabled_constraints)
 
         # --- Pre-process lookups ---
         self.faculty_busy_map: Dict[str, Set[Tuple[str, int]]] = {}
@@ -82,19 +92,31 @@ class TimetableGenerator:
             for slot in (f.busy_slots or []):
                 for p in (slot.periods or []):
                     busy.add((slot.day, p))
+            # Slots already taught in other saved timetables are off-limits too
+            busy |= (faculty_booked_elsewhere or {}).get(str(f.id), set())
             self.faculty_busy_map[str(f.id)] = busy
+        self.room_booked_elsewhere: Dict[str, Set[Tuple[str, int]]] = dict(room_booked_elsewhere or {})
 
         self.faculty_map = {str(f.id): f for f in self.faculty}
+
+        # Workload: one period counts as one load hour. Base load is what each
+        # faculty member already teaches in other saved timetables.
+        self.faculty_base_load: Dict[str, int] = dict(faculty_base_load or {})
+        self.faculty_max_load: Dict[str, int] = {str(f.id): f.max_load_hours for f in self.faculty}
+        self._capable_cache: Dict[str, List[Faculty]] = {}
+
+        # Electives sharing students must not run at the same time within a batch
+        self.elective_clashes = elective_clashes if elective_clashes is not None else ElectiveClashMatrix()
         self.room_map = {str(r.id): r for r in self.rooms}
         self.course_map = {str(c.id): c for c in self.courses}
 
-        # Separate rooms by type for smart assignment
-        self.lab_rooms = [r for r in self.rooms if (r.type or "").lower() == "lab"]
-        self.lecture_rooms = [r for r in self.rooms if (r.type or "").lower() != "lab"]
-        if not self.lecture_rooms:
-            self.lecture_rooms = self.rooms  # fallback
-        if not self.lab_rooms:
-            self.lab_rooms = self.rooms  # fallback
+        # Rooms indexed by type, capacity and features for smart assignment
+        self.room_index = RoomIndex(self.rooms)
+        self.section_size: Dict[str, int] = {sec["id"]: sec["student_count"] for sec in self.sections}
+        self.course_feature_mask: Dict[str, int] = {
+            str(c.id): self.room_index.feature_mask(getattr(c, "required_features", None) or [])
+            for c in self.courses
+        }
 
     # ─── Helpers ──────────────────────────────────────────────────
 
@@ -110,20 +132,44 @@ class TimetableGenerator:
         return None
 
     def _get_faculty_for_course(self, course_id: str) -> List[Faculty]:
+        cached = self._capable_cache.get(course_id)
+        if cached is not None:
+            return cached
         capable = []
         for f in self.faculty:
             for c in (f.can_teach or []):
                 if self._extract_link_id(c) == course_id:
                     capable.append(f)
                     break
-        return capable if capable else self.faculty
+        result = capable if capable else self.faculty
+        self._capable_cache[course_id] = result
+        return result
+
+    def _load_ratio(self, faculty_id: str, load: Counter) -> float:
+        total = self.faculty_base_load.get(faculty_id, 0) + load[faculty_id]
+        return total / max(1, self.faculty_max_load.get(faculty_id, 1))
+
+    def _has_capacity(self, faculty_id: str, load: Counter) -> bool:
+        total = self.faculty_base_load.get(faculty_id, 0) + load[faculty_id]
+        return total < self.faculty_max_load.get(faculty_id, 0)
+
+    def _rank_by_load(self, capable: List[Faculty], load: Counter) -> List[Faculty]:
+        """Capable faculty, least loaded first (random order among equals)."""
+        ranked = list(capable)
+        random.shuffle(ranked)
+        ranked.sort(key=lambda f: self._load_ratio(str(f.id), load))
+        return ranked
 
     def _valid_slots_for_faculty(self, faculty_id: str) -> List[Tuple[str, int]]:
         busy = self.faculty_busy_map.get(faculty_id, set())
         return [s for s in self.all_slots if s not in busy]
 
-    def _pick_room(self, is_practical: bool) -> Room:
-        return random.choice(self.lab_rooms if is_practical else self.lecture_rooms)
+    def _pick_room(self, is_practical: bool, section_id: str = "", course_id: str = "") -> Room:
+        return self.room_index.pick(
+            is_practical,
+            self.section_size.get(section_id, 0),
+            self.course_feature_mask.get(course_id, 0),
+        )
 
     # ─── Smart Initialization ────────────────────────────────────
 
@@ -157,6 +203,9 @@ class TimetableGenerator:
             batch_booked: Dict[str, Set[Tuple[str, int]]] = {}
             faculty_booked: Dict[str, Set[Tuple[str, int]]] = {}
             room_booked: Dict[str, Set[Tuple[str, int]]] = {}
+            faculty_load: Counter = Counter()
+            electives_at: Dict[Tuple[str, Tuple[str, int]], List[str]] = {}
+            clashes = self.elective_clashes
 
             # Shuffle to get diversity across chromosomes
             random.shuffle(sessions)
@@ -167,9 +216,11 @@ class TimetableGenerator:
                 is_prac = sess["practical"]
                 batch_id = sess["batch_id"]
                 section_id = sess["section_id"]
+                need_capacity = self.section_size.get(section_id, 0)
+                need_features = self.course_feature_mask.get(cid, 0)
+                is_elective = cid in clashes
 
-                capable = self._get_faculty_for_course(cid)
-                random.shuffle(capable)
+                capable = self._rank_by_load(self._get_faculty_for_course(cid), faculty_load)
 
                 placed = False
                 for fac in capable:
@@ -184,16 +235,18 @@ class TimetableGenerator:
                         # Check faculty not already at this slot
                         if slot in faculty_booked.get(fid, set()):
                             continue
+                        # Check no elective sharing students runs in this batch at this slot
+                        if is_elective and any(
+                            clashes.overlaps(cid, other) for other in electives_at.get((batch_id, slot), ())
+                        ):
+                            continue
 
-                        # Pick appropriate room type
-                        room_pool = self.lab_rooms if is_prac else self.lecture_rooms
-                        random.shuffle(room_pool)
-                        room_found = None
-                        for room in room_pool:
-                            rid = str(room.id)
-                            if slot not in room_booked.get(rid, set()):
-                                room_found = room
-                                break
+                        # Smallest free room of the right type, size and equipment
+                        room_found = self.room_index.smallest_free(
+                            is_prac, need_capacity, need_features,
+                            lambda rid: slot not in room_booked.get(rid, ())
+                            and slot not in self.room_booked_elsewhere.get(rid, ()),
+                        )
 
                         if room_found is None:
                             continue  # no free room at this slot, try next
@@ -203,6 +256,9 @@ class TimetableGenerator:
                         batch_booked.setdefault(bid, set()).add(slot)
                         faculty_booked.setdefault(fid, set()).add(slot)
                         room_booked.setdefault(rid, set()).add(slot)
+                        faculty_load[fid] += 1
+                        if is_elective:
+                            electives_at.setdefault((batch_id, slot), []).append(cid)
 
                         genes.append(Gene(cid, fid, rid, batch_id, slot[0], slot[1], is_prac, section_id))
                         placed = True
@@ -213,109 +269,20 @@ class TimetableGenerator:
 
                 if not placed:
                     # Fallback: random placement (will cause conflicts, GA will fix)
-                    fac = random.choice(capable)
+                    fac = capable[0]
                     fid = str(fac.id)
                     slot = random.choice(self.all_slots)
-                    room = self._pick_room(is_prac)
+                    room = self._pick_room(is_prac, section_id, cid)
+                    faculty_load[fid] += 1
                     genes.append(Gene(cid, fid, str(room.id), batch_id, slot[0], slot[1], is_prac, section_id))
 
-            population.append(Chromosome(genes))
+            population.append(Chromosome(genes, faculty_load))
         return population
 
     # ─── Fitness ─────────────────────────────────────────────────
 
     def calculate_fitness(self, chromosome: Chromosome) -> float:
-        score = 0.0
-        conflicts: List[str] = []
-
-        faculty_at: Dict[Tuple[str, int], Set[str]] = {}
-        room_at: Dict[Tuple[str, int], Set[str]] = {}
-        batch_at: Dict[Tuple[str, int], Set[str]] = {}  # keyed by section_id
-        batch_schedule: Dict[str, Dict[str, List[int]]] = {
-            sec["id"]: {d: [] for d in self.days} for sec in self.sections
-        }
-
-        for gene in chromosome.genes:
-            slot = (gene.day, gene.period)
-
-            # ── Hard: Faculty clash ──
-            fset = faculty_at.setdefault(slot, set())
-            if gene.faculty_id in fset:
-                score -= 100
-                conflicts.append(f"Hard: Faculty {gene.faculty_id} clashing at {slot}")
-            else:
-                fset.add(gene.faculty_id)
-
-            # ── Hard: Faculty busy slot ──
-            if slot in self.faculty_busy_map.get(gene.faculty_id, set()):
-                score -= 100
-                conflicts.append(f"Hard: Faculty {gene.faculty_id} scheduled in busy slot {slot}")
-
-            # ── Hard: Room clash ──
-            rset = room_at.setdefault(slot, set())
-            if gene.room_id in rset:
-                score -= 100
-                conflicts.append(f"Hard: Room {gene.room_id} clashing at {slot}")
-            else:
-                rset.add(gene.room_id)
-
-            # ── Hard: Section clash (a section can only be in one place at a time) ──
-            section_key = gene.section_id or gene.batch_id
-            bset = batch_at.setdefault(slot, set())
-            if section_key in bset:
-                score -= 100
-                conflicts.append(f"Hard: Section {section_key} clashing at {slot}")
-            else:
-                bset.add(section_key)
-
-            # ── Soft: Room-type mismatch ──
-            if gene.is_practical:
-                room = self.room_map.get(gene.room_id)
-                if room and (room.type or "").lower() != "lab":
-                    score -= 10
-                    course = self.course_map.get(gene.course_id)
-                    cname = course.name if course else gene.course_id
-                    conflicts.append(f"Soft: Practical {cname} in non-lab room {room.name}")
-
-            # Track for gap analysis
-            if section_key in batch_schedule:
-                batch_schedule[section_key][gene.day].append(gene.period)
-
-        # ── Soft: Gap & consecutive analysis ──
-        for bid, schedule in batch_schedule.items():
-            for day, periods in schedule.items():
-                if len(periods) < 2:
-                    continue
-                periods.sort()
-
-                for i in range(len(periods) - 1):
-                    gap = periods[i + 1] - periods[i]
-                    if gap > 1:
-                        score -= (gap - 1) * 2
-                        conflicts.append(f"Soft: Batch {bid} has a {gap - 1}h gap on {day}")
-
-                # Consecutive stretch > 4
-                consec = 1
-                for i in range(len(periods) - 1):
-                    if periods[i + 1] - periods[i] == 1:
-                        consec += 1
-                    else:
-                        consec = 1
-                    if consec > 4:
-                        score -= 3
-                        conflicts.append(f"Soft: Batch {bid} has >4 consecutive classes on {day}")
-                        break
-
-        # ── Soft: Spread classes across days (avoid overloading one day) ──
-        for bid, schedule in batch_schedule.items():
-            counts = [len(ps) for ps in schedule.values()]
-            if counts:
-                avg = sum(counts) / len(counts)
-                for cnt in counts:
-                    diff = abs(cnt - avg)
-                    if diff > 2:
-                        score -= diff
-
+        score, conflicts = self.constraints.evaluate(self, chromosome.genes)
         chromosome.fitness = score
         chromosome.conflicts = conflicts
         return score
@@ -341,15 +308,19 @@ class TimetableGenerator:
 
             elif strategy < 0.70:
                 # Strategy 2: Change room (fix room-type mismatch)
-                room = self._pick_room(gene.is_practical)
+                room = self._pick_room(gene.is_practical, gene.section_id, gene.course_id)
                 gene.room_id = str(room.id)
 
             elif strategy < 0.90:
-                # Strategy 3: Change faculty
+                # Strategy 3: Change faculty (prefer those with spare load)
                 capable = self._get_faculty_for_course(gene.course_id)
                 if capable:
-                    new_fac = random.choice(capable)
+                    load = chromosome.faculty_load
+                    spare = [f for f in capable if self._has_capacity(str(f.id), load)]
+                    new_fac = random.choice(spare or capable)
+                    load[gene.faculty_id] -= 1
                     gene.faculty_id = str(new_fac.id)
+                    load[gene.faculty_id] += 1
                     # Also re-slot to valid time for new faculty
                     valid = self._valid_slots_for_faculty(gene.faculty_id)
                     if valid:
@@ -394,8 +365,10 @@ class TimetableGenerator:
 
         best_ever: Optional[Chromosome] = None
         stagnation = 0
+        base_mutation_rate = self.mutation_rate
 
         for gen in range(self.generations):
+            self.generations_run = gen + 1
             for chrom in population:
                 self.calculate_fitness(chrom)
 
@@ -423,7 +396,7 @@ class TimetableGenerator:
             if stagnation > 30:
                 self.mutation_rate = min(0.6, self.mutation_rate + 0.05)
             elif stagnation == 0:
-                self.mutation_rate = 0.35
+                self.mutation_rate = base_mutation_rate
 
             # Build next generation
             next_gen = [
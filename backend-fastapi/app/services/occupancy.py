@@ -0,0 +1,158 @@
+"""
+Institution-wide slot occupancy.
+
+An in-process index of which faculty, room and section is booked at every
+(day, period) across all saved timetables, so conflict checks never scan
+timetables. For each (resource kind, resource id) it keeps
+
+  * a per-day period bitmask, for O(1) "is this slot taken?" checks, and
+  * the set of (timetable_id, entry_id) references per slot, to report who
+    holds it and to ignore a given entry or timetable when needed.
+
+The index is rebuilt from MongoDB at startup (``occupancy.load()``) and
+updated by the endpoints right after each timetable write.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+from app.models.timetable import Timetable
+
+FACULTY = "faculty"
+ROOM = "room"
+SECTION = "section"
+
+Slot = Tuple[str, int]
+
+
+class EntryRef(NamedTuple):
+    timetable_id: str
+    entry_id: str
+
+
+def entry_resources(entry) -> List[Tuple[str, str]]:
+    """(kind, id) pairs an entry occupies."""
+    resources = [(FACULTY, entry.faculty_id), (ROOM, entry.room_id)]
+    section = getattr(entry, "section_id", "") or entry.batch_id
+    if section:
+        resources.append((SECTION, section))
+    return [(k, rid) for k, rid in resources if rid]
+
+
+class OccupancyIndex:
+    def __init__(self):
+        self._refs: Dict[Tuple[str, str], Dict[Slot, Set[EntryRef]]] = {}
+        self._masks: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._by_timetable: Dict[str, List[Tuple[str, str, Slot, EntryRef]]] = {}
+        self.loaded = False
+
+    # ─── Maintenance ───
+
+    def clear(self) -> None:
+        self._refs.clear()
+        self._masks.clear()
+        self._by_timetable.clear()
+
+    def _add(self, kind: str, rid: str, slot: Slot, ref: EntryRef) -> None:
+        key = (kind, rid)
+        self._refs.setdefault(key, {}).setdefault(slot, set()).add(ref)
+        days = self._masks.setdefault(key, {})
+        days[slot[0]] = days.get(slot[0], 0) | (1 << slot[1])
+
+    def _discard(self, kind: str, rid: str, slot: Slot, ref: EntryRef) -> None:
+        key = (kind, rid)
+        slots = self._refs.get(key)
+        if not slots or slot not in slots:
+            return
+        slots[slot].discard(ref)
+        if not slots[slot]:
+            del slots[slot]
+            days = self._masks[key]
+            days[slot[0]] &= ~(1 << slot[1])
+
+    def remove_timetable(self, timetable_id: str) -> None:
+        for kind, rid, slot, ref in self._by_timetable.pop(str(timetable_id), []):
+            self._discard(kind, rid, slot, ref)
+
+    def index_timetable(self, t: Timetable) -> None:
+        """(Re)index one timetable after it was inserted or modified."""
+        tid = str(t.id)
+        self.remove_timetable(tid)
+        booked = []
+        for e in (t.entries or []):
+            ref = EntryRef(tid, e.entry_id)
+            slot = (e.day, e.period)
+            for kind, rid in entry_resources(e):
+                self._add(kind, rid, slot, ref)
+                booked.append((kind, rid, slot, ref))
+        self._by_timetable[tid] = booked
+
+    async def load(self) -> None:
+        """Rebuild the whole index from the database."""
+        self.clear()
+        async for t in Timetable.find_all():
+            self.index_timetable(t)
+        self.loaded = True
+
+    # ─── Queries ───
+
+    def day_mask(self, kind: str, rid: str, day: str, ignore_entry: EntryRef | None = None) -> int:
+        """
+        Bitmask of booked periods (bit ``p`` set when period ``p`` is taken).
+        Periods held only by ``ignore_entry`` are left clear.
+        """
+        mask = self._masks.get((kind, rid), {}).get(day, 0)
+        if ignore_entry is not None and mask:
+            slots = self._refs[(kind, rid)]
+            for p in range(mask.bit_length()):
+                if mask >> p & 1 and slots.get((day, p)) == {ignore_entry}:
+                    mask &= ~(1 << p)
+        return mask
+
+    def holders(self, kind: str, rid: str, slot: Slot) -> Set[EntryRef]:
+        return self._refs.get((kind, rid), {}).get(slot, set())
+
+    def conflicts(
+        self,
+        kind: str,
+        rid: str,
+        slot: Slot,
+        ignore_entries: Iterable[EntryRef] = (),
+        ignore_timetables: Iterable[str] = (),
+    ) -> List[EntryRef]:
+        """Entries other than the ignored ones booking ``rid`` at ``slot``."""
+        if not self.day_mask(kind, rid, slot[0]) >> slot[1] & 1:
+            return []
+        ignore_entries = set(ignore_entries)
+        ignore_timetables = set(ignore_timetables)
+        return [
+            ref for ref in self.holders(kind, rid, slot)
+            if ref not in ignore_entries and ref.timetable_id not in ignore_timetables
+        ]
+
+    def is_busy(self, kind: str, rid: str, slot: Slot, **ignore) -> bool:
+        return bool(self.conflicts(kind, rid, slot, **ignore))
+
+    def busy_map(self, kind: str, ignore_timetables: Iterable[str] = ()) -> Dict[str, Set[Slot]]:
+        """resource id -> booked slots for one kind, skipping the given timetables."""
+        ignore_timetables = set(ignore_timetables)
+        result: Dict[str, Set[Slot]] = {}
+        for (k, rid), slots in self._refs.items():
+            if k != kind:
+                continue
+            taken = {
+                slot for slot, refs in slots.items()
+                if any(ref.timetable_id not in ignore_timetables for ref in refs)
+            }
+            if taken:
+                result[rid] = taken
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "timetables": len(self._by_timetable),
+            "resources": len(self._refs),
+            "bookings": sum(len(b) for b in self._by_timetable.values()),
+        }
+
+
+occupancy = OccupancyIndex()
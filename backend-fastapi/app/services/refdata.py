@@ -0,0 +1,168 @@
+"""
+In-process cache of the small, slowly changing reference collections
+(programs, batches, semesters, sections, courses, rooms, faculty).
+
+Each collection is loaded whole in one query and kept until its TTL expires
+or a write endpoint invalidates it. ``reference_data`` is warmed at startup.
+
+Cached documents are shared between requests: treat them as read-only. Code
+that modifies and saves a document must load it from the database instead.
+"""
+
+import asyncio
+import time
+from typing import Dict, Generic, Iterable, List, Optional, Type, TypeVar
+
+from beanie import Document, PydanticObjectId
+
+from app.models.courses import Course
+from app.models.faculty import Faculty
+from app.models.infrastructure import Room
+from app.models.programs import Program, Batch, Semester, Section
+
+T = TypeVar("T", bound=Document)
+
+# Seconds before a collection is reloaded even without an invalidation.
+TTL_SECONDS = {
+    "programs": 600,
+    "batches": 600,
+    "semesters": 600,
+    "sections": 600,
+    "courses": 600,
+    "rooms": 300,
+    "faculty": 120,
+}
+
+
+class CollectionCache(Generic[T]):
+    def __init__(self, model: Type[T], ttl: float):
+        self.model = model
+        self.ttl = ttl
+        self._docs: Dict[str, T] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Bumped whenever the cached contents change; lets callers memoize
+        # values derived from them (e.g. the program tree).
+        self.version = 0
+        # Last shared collection version seen (app.services.versions)
+        self.collection_version: Optional[int] = None
+
+    def _fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def _ensure(self) -> None:
+        if self._fresh():
+            self.hits += 1
+            return
+        async with self._lock:
+            if self._fresh():
+                self.hits += 1
+                return
+            self.misses += 1
+            docs = await self.model.find_all().to_list()
+            self._docs = {str(d.id): d for d in docs}
+            self._loaded_at = time.monotonic()
+            self.version += 1
+
+    async def all(self) -> List[T]:
+        await self._ensure()
+        return list(self._docs.values())
+
+    async def get(self, doc_id) -> Optional[T]:
+        await self._ensure()
+        key = str(doc_id)
+        doc = self._docs.get(key)
+        if doc is None and PydanticObjectId.is_valid(key):
+            # Written by another process since the last load
+            self.misses += 1
+            doc = await self.model.get(PydanticObjectId(key))
+            if doc is not None:
+                self._docs[key] = doc
+                self.version += 1
+        return doc
+
+    async def get_many(self, doc_ids: Iterable) -> Dict[str, T]:
+        await self._ensure()
+        found: Dict[str, T] = {}
+        missing = []
+        for doc_id in doc_ids:
+            key = str(doc_id)
+            doc = self._docs.get(key)
+            if doc is not None:
+                found[key] = doc
+            elif PydanticObjectId.is_valid(key):
+                missing.append(PydanticObjectId(key))
+        if missing:
+            self.misses += 1
+            async for doc in self.model.find({"_id": {"$in": missing}}):
+                self._docs[str(doc.id)] = doc
+                found[str(doc.id)] = doc
+                self.version += 1
+        return found
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+        self.invalidations += 1
+
+    def observe(self, collection_version: int) -> None:
+        """Invalidate if the collection was written since the last observed version."""
+        if collection_version != self.collection_version:
+            self.invalidate()
+        self.collection_version = collection_version
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self._docs),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "ttl_seconds": self.ttl,
+        }
+
+
+class ReferenceData:
+    def __init__(self):
+        self.programs = CollectionCache(Program, TTL_SECONDS["programs"])
+        self.batches = CollectionCache(Batch, TTL_SECONDS["batches"])
+        self.semesters = CollectionCache(Semester, TTL_SECONDS["semesters"])
+        self.sections = CollectionCache(Section, TTL_SECONDS["sections"])
+        self.courses = CollectionCache(Course, TTL_SECONDS["courses"])
+        self.rooms = CollectionCache(Room, TTL_SECONDS["rooms"])
+        self.faculty = CollectionCache(Faculty, TTL_SECONDS["faculty"])
+
+    def caches(self) -> Dict[str, CollectionCache]:
+        return {
+            "programs": self.programs,
+            "batches": self.batches,
+            "semesters": self.semesters,
+            "sections": self.sections,
+            "courses": self.courses,
+            "rooms": self.rooms,
+            "faculty": self.faculty,
+        }
+
+    async def warm(self) -> None:
+        for cache in self.caches().values():
+            await cache.all()
+
+    def invalidate(self, *names: str) -> None:
+        """Drop the named collections (all of them when none are given)."""
+        caches = self.caches()
+        for name in names or caches:
+            caches[name].invalidate()
+
+    def observe(self, versions: Dict[str, int]) -> None:
+        """Feed shared collection versions in; caches of collections that moved are dropped."""
+        caches = self.caches()
+        for name, version in versions.items():
+            if name in caches:
+                caches[name].observe(version)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: cache.stats() for name, cache in self.caches().items()}
+
+
+reference_data = ReferenceData()
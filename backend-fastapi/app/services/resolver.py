@@ -0,0 +1,74 @@
+"""
+Batched resolution of the program/batch/semester/section references held by
+timetables.
+
+Instead of one ``get`` per link per timetable, all referenced ids across a
+result set are collected and looked up in the reference-data cache, which
+only goes to MongoDB (one ``$in`` per collection) for ids it hasn't seen.
+"""
+
+from typing import Dict, Iterable, Optional, Set
+
+from app.models.programs import Program, Batch, Semester, Section
+from app.models.timetable import Timetable
+from app.services.refdata import reference_data
+
+
+def extract_link_id(link_field) -> str | None:
+    if link_field is None:
+        return None
+    if hasattr(link_field, "id"):
+        return str(link_field.id)
+    if hasattr(link_field, "ref") and link_field.ref:
+        return str(link_field.ref.id)
+    return None
+
+
+class TimetableRefs:
+    """Display names for the documents referenced by a set of timetables."""
+
+    def __init__(self, programs=None, batches=None, semesters=None, sections=None):
+        self.programs: Dict[str, Program] = programs or {}
+        self.batches: Dict[str, Batch] = batches or {}
+        self.semesters: Dict[str, Semester] = semesters or {}
+        self.sections: Dict[str, Section] = sections or {}
+
+    def program_name(self, pid: str | None) -> str:
+        p = self.programs.get(pid or "")
+        return p.name if p else ""
+
+    def batch_name(self, bid: str | None) -> str:
+        b = self.batches.get(bid or "")
+        return b.name if b else ""
+
+    def semester(self, sid: str | None) -> Optional[Semester]:
+        return self.semesters.get(sid or "")
+
+    def section_name(self, sid: str | None) -> str:
+        s = self.sections.get(sid or "")
+        return s.name if s else ""
+
+
+async def resolve_timetable_refs(timetables: Iterable[Timetable]) -> TimetableRefs:
+    """Resolve every referenced program, batch, semester and section (four queries at most on a cold cache)."""
+    program_ids: Set[str] = set()
+    batch_ids: Set[str] = set()
+    semester_ids: Set[str] = set()
+    section_ids: Set[str] = set()
+    for t in timetables:
+        for ids, link in (
+            (program_ids, t.program),
+            (batch_ids, t.batch),
+            (semester_ids, t.semester),
+            (section_ids, t.section),
+        ):
+            lid = extract_link_id(link)
+            if lid:
+                ids.add(lid)
+
+    return TimetableRefs(
+        programs=await reference_data.programs.get_many(program_ids),
+        batches=await reference_data.batches.get_many(batch_ids),
+        semesters=await reference_data.semesters.get_many(semester_ids),
+        sections=await reference_data.sections.get_many(section_ids),
+    )
@@ -0,0 +1,109 @@
+"""
+Room lookup index for the timetable generator.
+
+Rooms are bucketed by kind (lab / lecture, as the generator always split
+them), sorted by capacity and tagged with a feature bitmask. For a request
+(kind, minimum capacity, required features) the index keeps one pre-filtered,
+capacity-sorted list per (kind, feature mask), so selection is a bisect into
+that list followed by a scan that stops at the first free room.
+"""
+
+import random
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.models.infrastructure import Room
+
+
+def _room_kind(room: Room) -> str:
+    return "lab" if (room.type or "").lower() == "lab" else "lecture"
+
+
+class RoomIndex:
+    def __init__(self, rooms: List[Room]):
+        self.rooms = rooms
+        self.feature_bits: Dict[str, int] = {}
+        self.room_masks: Dict[str, int] = {}
+        for r in rooms:
+            self.room_masks[str(r.id)] = self.feature_mask(r.features or [], register=True)
+
+        self.buckets: Dict[str, List[Room]] = {"lab": [], "lecture": []}
+        for r in sorted(rooms, key=lambda r: r.capacity or 0):
+            self.buckets[_room_kind(r)].append(r)
+        # Keep the previous fallback: an empty bucket borrows every room
+        for kind, bucket in self.buckets.items():
+            if not bucket:
+                self.buckets[kind] = sorted(rooms, key=lambda r: r.capacity or 0)
+
+        self._filtered: Dict[Tuple[str, int], Tuple[List[int], List[Room]]] = {}
+
+    # ─── Features ───
+
+    def feature_mask(self, features: Iterable[str], register: bool = False) -> int:
+        """Bitmask for a feature list. Unknown features map to a bit no room has."""
+        mask = 0
+        for name in features:
+            key = str(name).strip().lower()
+            if not key:
+                continue
+            bit = self.feature_bits.get(key)
+            if bit is None:
+                if not register:
+                    # A requirement no room can satisfy
+                    bit = 1 << (len(self.feature_bits) + 64)
+                    mask |= bit
+                    continue
+                bit = 1 << len(self.feature_bits)
+                self.feature_bits[key] = bit
+            mask |= bit
+        return mask
+
+    def room_mask(self, room_id: str) -> int:
+        return self.room_masks.get(room_id, 0)
+
+    # ─── Lookup ───
+
+    def _bucket(self, is_practical: bool, required_mask: int) -> Tuple[List[int], List[Room]]:
+        kind = "lab" if is_practical else "lecture"
+        key = (kind, required_mask)
+        cached = self._filtered.get(key)
+        if cached is None:
+            rooms = [
+                r for r in self.buckets[kind]
+                if self.room_masks[str(r.id)] & required_mask == required_mask
+            ]
+            cached = ([r.capacity or 0 for r in rooms], rooms)
+            self._filtered[key] = cached
+        return cached
+
+    def adequate(self, is_practical: bool, min_capacity: int = 0, required_mask: int = 0) -> Tuple[List[Room], int]:
+        """Capacity-sorted rooms of the right kind and features, and the index of the first big enough one."""
+        caps, rooms = self._bucket(is_practical, required_mask)
+        return rooms, bisect_left(caps, min_capacity)
+
+    def smallest_free(
+        self,
+        is_practical: bool,
+        min_capacity: int,
+        required_mask: int,
+        is_free: Callable[[str], bool],
+    ) -> Optional[Room]:
+        """Smallest adequate room for which ``is_free(room_id)`` holds, else ``None``."""
+        rooms, lo = self.adequate(is_practical, min_capacity, required_mask)
+        if lo < len(rooms):
+            for i in range(lo, len(rooms)):
+                if is_free(str(rooms[i].id)):
+                    return rooms[i]
+            return None
+        # Nothing is big enough / equipped: fall back to the largest rooms of this kind
+        for room in reversed(self.buckets["lab" if is_practical else "lecture"]):
+            if is_free(str(room.id)):
+                return room
+        return None
+
+    def pick(self, is_practical: bool, min_capacity: int = 0, required_mask: int = 0) -> Room:
+        """A random adequate room (any room of the kind if none is adequate)."""
+        rooms, lo = self.adequate(is_practical, min_capacity, required_mask)
+        if lo < len(rooms):
+            return rooms[random.randrange(lo, len(rooms))]
+        return random.choice(self.buckets["lab" if is_practical else "lecture"])
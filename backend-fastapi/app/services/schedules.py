@@ -0,0 +1,32 @@
+"""
+Read-side queries over timetable entries.
+"""
+
+from typing import List
+
+from app.models.timetable import Timetable
+
+
+async def faculty_schedule(faculty_id: str) -> List[dict]:
+    """
+    Every entry taught by ``faculty_id`` across all timetables, in one query.
+    The ``$match`` uses the multikey ``entries.faculty_id`` index so only
+    timetables containing the faculty are read; ``$filter`` drops their other
+    entries server-side.
+    """
+    pipeline = [
+        {"$match": {"entries.faculty_id": faculty_id}},
+        {"$project": {
+            "_id": 0,
+            "entries": {
+                "$filter": {
+                    "input": "$entries",
+                    "as": "e",
+                    "cond": {"$eq": ["$$e.faculty_id", faculty_id]},
+                }
+            },
+        }},
+        {"$unwind": "$entries"},
+        {"$replaceRoot": {"newRoot": "$entries"}},
+    ]
+    return await Timetable.aggregate(pipeline).to_list()
@@ -0,0 +1,178 @@
+"""
+Typeahead search over courses, faculty and rooms.
+
+An in-memory index built from the reference-data cache and rebuilt only when
+one of the three cached collections changes (their version counters). Every
+entity contributes lower-cased terms: course code and name words, faculty
+name words, email and department words, room name words.
+
+  * Prefix matching walks a sorted term list from a ``bisect`` position, so
+    a query word costs O(log n) plus the terms it matches.
+  * When prefixes find too few hits, a trigram index over the distinct
+    terms supplies fuzzy matches (typos, transpositions), scored by the share
+    of each query word's trigrams found in the closest term of an entity.
+"""
+
+import asyncio
+import heapq
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.services.refdata import reference_data
+
+COURSE = "course"
+FACULTY = "faculty"
+ROOM = "room"
+KINDS = (COURSE, FACULTY, ROOM)
+
+FUZZY_MIN_LENGTH = 3    # shorter queries are prefix-only
+FUZZY_THRESHOLD = 0.5   # share of query-word trigrams the matched terms must contain
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+class SearchHit(NamedTuple):
+    type: str
+    id: str
+    label: str
+    sublabel: str
+
+
+def _words(text: Optional[str]) -> List[str]:
+    return _WORD.findall((text or "").lower())
+
+
+def _trigrams(word: str) -> Set[str]:
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    def __init__(self):
+        self._hits: List[SearchHit] = []
+        self._terms: List[Tuple[str, int, int]] = []  # (term, entity, rank) sorted by term
+        self._owners: Dict[str, List[int]] = {}       # distinct term -> entities using it
+        self._grams: Dict[str, List[str]] = {}        # trigram -> distinct terms containing it
+        self._key: Optional[tuple] = None
+        self._lock = asyncio.Lock()
+        self.builds = 0
+
+    # ─── Building ───
+
+    def build(self, courses: Iterable, faculty: Iterable, rooms: Iterable) -> None:
+        hits: List[SearchHit] = []
+        terms: List[Tuple[str, int, int]] = []
+        owners: Dict[str, List[int]] = {}
+
+        def add(hit: SearchHit, *fields: Optional[str]) -> None:
+            # ``rank`` is the position of the term in the entity; matching the
+            # leading term ("CS1" for CS101) ranks above matching a later one.
+            idx = len(hits)
+            hits.append(hit)
+            rank = 0
+            for field in fields:
+                for word in _words(field):
+                    terms.append((word, idx, rank))
+                    owners.setdefault(word, []).append(idx)
+                    rank += 1
+
+        for c in courses:
+            add(SearchHit(COURSE, str(c.id), c.name, c.code), c.code, c.name)
+        for f in faculty:
+            email = (f.email or "").lower()
+            add(SearchHit(FACULTY, str(f.id), f.name, f"{f.department}, {f.email}"), f.name, email.split("@")[0], f.department)
+            terms.append((email, len(hits) - 1, 99))  # whole address, for pasted emails
+        for r in rooms:
+            add(SearchHit(ROOM, str(r.id), r.name, f"{r.type}, {r.capacity} seats"), r.name)
+
+        terms.sort()
+        grams: Dict[str, List[str]] = {}
+        for word in owners:
+            for g in _trigrams(word):
+                grams.setdefault(g, []).append(word)
+        self._hits, self._terms, self._owners, self._grams = hits, terms, owners, grams
+        self.builds += 1
+
+    async def refresh(self) -> None:
+        """Rebuild from the reference cache if any of its collections changed."""
+        courses = await reference_data.courses.all()
+        faculty = await reference_data.faculty.all()
+        rooms = await reference_data.rooms.all()
+        key = (reference_data.courses.version, reference_data.faculty.version, reference_data.rooms.version)
+        if key == self._key:
+            return
+        async with self._lock:
+            if key != self._key:
+                # Off the event loop: a large catalogue takes a noticeable time to index
+                await asyncio.to_thread(self.build, courses, faculty, rooms)
+                self._key = key
+
+    # ─── Queries ───
+
+    def _prefix_scores(self, word: str) -> Dict[int, float]:
+        """entity -> best score among its terms starting with ``word``."""
+        scores: Dict[int, float] = {}
+        i = bisect_left(self._terms, (word,))
+        while i < len(self._terms) and self._terms[i][0].startswith(word):
+            term, idx, rank = self._terms[i]
+            score = (2.0 if term == word else 1.0) + (1.0 if rank == 0 else 0.0)
+            if score > scores.get(idx, 0.0):
+                scores[idx] = score
+            i += 1
+        return scores
+
+    def _fuzzy_scores(self, words: List[str]) -> Dict[int, float]:
+        """entity -> mean over query words of the best trigram overlap with its terms."""
+        totals: Dict[int, float] = {}
+        for word in words:
+            wanted = _trigrams(word)
+            shared: Dict[str, int] = {}
+            for g in wanted:
+                for term in self._grams.get(g, ()):
+                    shared[term] = shared.get(term, 0) + 1
+            best: Dict[int, float] = {}
+            for term, n in shared.items():
+                similarity = n / len(wanted)
+                for idx in self._owners[term]:
+                    if similarity > best.get(idx, 0.0):
+                        best[idx] = similarity
+            for idx, similarity in best.items():
+                totals[idx] = totals.get(idx, 0.0) + similarity / len(words)
+        return {idx: s for idx, s in totals.items() if s >= FUZZY_THRESHOLD}
+
+    def search(self, query: str, kinds: Iterable[str] = KINDS, limit: int = 10) -> List[SearchHit]:
+        """
+        Entities whose terms start with every word of ``query`` (best first),
+        topped up with fuzzy matches when fewer than ``limit`` are found.
+        """
+        query = query.strip().lower()
+        words = [query] if "@" in query else _words(query)
+        if not words:
+            return []
+        kinds = set(kinds)
+
+        scores: Optional[Dict[int, float]] = None
+        for word in words:
+            found = self._prefix_scores(word)
+            if scores is None:
+                scores = found
+            else:
+                scores = {idx: s + found[idx] for idx, s in scores.items() if idx in found}
+            if not scores:
+                break
+        scores = {idx: s for idx, s in (scores or {}).items() if self._hits[idx].type in kinds}
+
+        if len(scores) < limit and len("".join(words)) >= FUZZY_MIN_LENGTH:
+            for idx, s in self._fuzzy_scores(words).items():
+                if idx not in scores and self._hits[idx].type in kinds:
+                    scores[idx] = s - 1.0  # always below any prefix match
+
+        ranked = heapq.nsmallest(limit, scores, key=lambda idx: (-scores[idx], self._hits[idx].label.lower()))
+        return [self._hits[idx] for idx in ranked]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entities": len(self._hits), "terms": len(self._owners), "builds": self.builds}
+
+
+search_index = SearchIndex()
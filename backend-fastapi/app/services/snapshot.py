@@ -0,0 +1,403 @@
+"""
+Offline dataset snapshots for the timetable generator.
+
+A snapshot holds everything ``TimetableGenerator`` needs (courses, faculty,
+rooms, batches, sections, the schedule config and what other timetables
+already take up: faculty load and booked faculty/room slots) so that a solve
+can be reproduced without MongoDB. Snapshots are stored either as a single JSON
+document or as a Parquet table with one row per record
+(``collection``, ``document`` as a JSON string).
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from beanie import Link, PydanticObjectId
+from bson import DBRef
+
+from app.models.courses import Course, CourseComponent
+from app.models.faculty import Faculty, TimeSlot
+from app.models.infrastructure import Room
+from app.models.programs import Program, Batch, Semester, Section
+from app.models.timetable import ScheduleConfig, BreakSlot, Timetable
+from app.models.versioned import VersionView
+from app.services.electives import ElectiveClashMatrix, elective_choices
+from app.services.occupancy import FACULTY, ROOM, occupancy
+from app.services.resolver import extract_link_id
+from app.services.workload import faculty_load_hours
+
+SNAPSHOT_VERSION = 1
+COLLECTIONS = (
+    "courses", "faculty", "rooms", "batches", "sections", "schedule_config", "elective_choices",
+    "faculty_base_load", "faculty_booked_elsewhere", "room_booked_elsewhere",
+)
+# Collections stored as one record rather than a list of them
+SINGLE_RECORDS = ("schedule_config", "faculty_base_load", "faculty_booked_elsewhere", "room_booked_elsewhere")
+
+BookedSlots = Dict[str, Set[Tuple[str, int]]]
+
+
+def _link(collection: str, model, oid: str | None):
+    if not oid:
+        return None
+    return Link(DBRef(collection, PydanticObjectId(oid)), model)
+
+
+# ─── Document -> plain dict ───────────────────────────────────────
+
+def course_to_dict(c: Course) -> dict:
+    return {
+        "id": str(c.id),
+        "code": c.code,
+        "name": c.name,
+        "credits": c.credits,
+        "type": c.type,
+        "components": c.components.model_dump() if c.components else {"lecture": 0, "tutorial": 0, "practical": 0},
+        "program_id": extract_link_id(c.program),
+        "semester_id": extract_link_id(c.semester),
+        "is_elective": c.is_elective,
+        "required_features": list(c.required_features or []),
+    }
+
+
+def faculty_to_dict(f: Faculty) -> dict:
+    return {
+        "id": str(f.id),
+        "name": f.name,
+        "email": f.email,
+        "department": f.department,
+        "designation": f.designation,
+        "max_load_hours": f.max_load_hours,
+        "current_load_hours": f.current_load_hours,
+        "can_teach_course_ids": [cid for cid in (extract_link_id(c) for c in (f.can_teach or [])) if cid],
+        "busy_slots": [s.model_dump() for s in (f.busy_slots or [])],
+    }
+
+
+def room_to_dict(r: Room) -> dict:
+    return {
+        "id": str(r.id),
+        "name": r.name,
+        "capacity": r.capacity,
+        "type": r.type,
+        "features": list(r.features or []),
+    }
+
+
+def batch_to_dict(b: Batch) -> dict:
+    return {
+        "id": str(b.id),
+        "name": b.name,
+        "start_year": b.start_year,
+        "end_year": b.end_year,
+        "section_ids": [sid for sid in (extract_link_id(s) for s in (b.sections or [])) if sid],
+    }
+
+
+def section_to_dict(s: Section) -> dict:
+    return {"id": str(s.id), "name": s.name, "student_count": s.student_count}
+
+
+def schedule_config_to_dict(c: ScheduleConfig) -> dict:
+    return {
+        "id": str(c.id) if c.id else None,
+        "semester_id": extract_link_id(c.semester),
+        "name": c.name,
+        "start_time": c.start_time,
+        "period_duration_minutes": c.period_duration_minutes,
+        "periods_per_day": c.periods_per_day,
+        "breaks": [b.model_dump() for b in (c.breaks or [])],
+        "working_days": list(c.working_days or []),
+        "constraint_weights": dict(c.constraint_weights or {}),
+        "disabled_constraints": list(c.disabled_constraints or []),
+    }
+
+
+def booked_to_dict(booked: BookedSlots) -> dict:
+    return {rid: sorted([day, period] for day, period in slots) for rid, slots in booked.items()}
+
+
+# ─── Plain dict -> Document ───────────────────────────────────────
+# Beanie documents refuse to be instantiated before ``init_beanie`` has run,
+# so offline records are built with ``model_construct`` (nested models are
+# converted explicitly since construct skips validation).
+
+def course_from_dict(d: dict) -> Course:
+    return Course.model_construct(
+        id=PydanticObjectId(d["id"]),
+        code=d.get("code", ""),
+        name=d.get("name", ""),
+        credits=int(d.get("credits", 0)),
+        type=d.get("type", ""),
+        components=CourseComponent(**(d.get("components") or {})),
+        program=_link("programs", Program, d.get("program_id")),
+        semester=_link("semesters", Semester, d.get("semester_id")),
+        is_elective=bool(d.get("is_elective", False)),
+        required_features=list(d.get("required_features", [])),
+    )
+
+
+def faculty_from_dict(d: dict) -> Faculty:
+    return Faculty.model_construct(
+        id=PydanticObjectId(d["id"]),
+        name=d.get("name", ""),
+        email=d.get("email", ""),
+        department=d.get("department", ""),
+        designation=d.get("designation", ""),
+        max_load_hours=int(d.get("max_load_hours", 18)),
+        current_load_hours=int(d.get("current_load_hours", 0)),
+        can_teach=[_link("courses", Course, cid) for cid in d.get("can_teach_course_ids", []) if cid],
+        busy_slots=[TimeSlot(**s) for s in d.get("busy_slots", [])],
+    )
+
+
+def room_from_dict(d: dict) -> Room:
+    return Room.model_construct(
+        id=PydanticObjectId(d["id"]),
+        name=d.get("name", ""),
+        capacity=int(d.get("capacity", 0)),
+        type=d.get("type", "Lecture"),
+        features=list(d.get("features", [])),
+    )
+
+
+def batch_from_dict(d: dict) -> Batch:
+    return Batch.model_construct(
+        id=PydanticObjectId(d["id"]),
+        name=d.get("name", ""),
+        start_year=int(d.get("start_year", 0)),
+        end_year=int(d.get("end_year", 0)),
+        current_semester=None,
+        sections=[_link("sections", Section, sid) for sid in d.get("section_ids", []) if sid],
+    )
+
+
+def section_from_dict(d: dict) -> Section:
+    return Section.model_construct(
+        id=PydanticObjectId(d["id"]),
+        name=d.get("name", ""),
+        student_count=int(d.get("student_count", 0)),
+    )
+
+
+def schedule_config_from_dict(d: dict) -> ScheduleConfig:
+    return ScheduleConfig.model_construct(
+        id=PydanticObjectId(d["id"]) if d.get("id") else None,
+        semester=_link("semesters", Semester, d.get("semester_id")),
+        name=d.get("name", "Default Schedule"),
+        start_time=d.get("start_time", "09:00"),
+        period_duration_minutes=int(d.get("period_duration_minutes", 60)),
+        periods_per_day=int(d.get("periods_per_day", 8)),
+        breaks=[BreakSlot(**b) for b in d.get("breaks", [])],
+        working_days=list(d.get("working_days") or ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]),
+        constraint_weights=dict(d.get("constraint_weights") or {}),
+        disabled_constraints=list(d.get("disabled_constraints") or []),
+    )
+
+
+def booked_from_dict(d: dict) -> BookedSlots:
+    return {rid: {(day, int(period)) for day, period in slots} for rid, slots in (d or {}).items()}
+
+
+# ─── Snapshot ─────────────────────────────────────────────────────
+
+class Snapshot:
+    """In-memory view of a generator dataset, independent of MongoDB."""
+
+    def __init__(
+        self,
+        courses: List[Course],
+        faculty: List[Faculty],
+        rooms: List[Room],
+        batches: List[Batch],
+        sections: List[Section] | None = None,
+        schedule_config: Optional[ScheduleConfig] = None,
+        elective_choices: List[List[str]] | None = None,
+        faculty_base_load: Dict[str, int] | None = None,
+        faculty_booked_elsewhere: BookedSlots | None = None,
+        room_booked_elsewhere: BookedSlots | None = None,
+        meta: Dict[str, Any] | None = None,
+    ):
+        self.courses = courses
+        self.faculty = faculty
+        self.rooms = rooms
+        self.batches = batches
+        self.sections = sections or []
+        self.schedule_config = schedule_config
+        self.elective_choices = elective_choices or []
+        self.faculty_base_load = faculty_base_load or {}
+        self.faculty_booked_elsewhere = faculty_booked_elsewhere or {}
+        self.room_booked_elsewhere = room_booked_elsewhere or {}
+        self.meta = meta or {}
+
+    def to_dict(self) -> dict:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "meta": self.meta,
+            "courses": [course_to_dict(c) for c in self.courses],
+            "faculty": [faculty_to_dict(f) for f in self.faculty],
+            "rooms": [room_to_dict(r) for r in self.rooms],
+            "batches": [batch_to_dict(b) for b in self.batches],
+            "sections": [section_to_dict(s) for s in self.sections],
+            "schedule_config": schedule_config_to_dict(self.schedule_config) if self.schedule_config else None,
+            "elective_choices": self.elective_choices,
+            "faculty_base_load": self.faculty_base_load,
+            "faculty_booked_elsewhere": booked_to_dict(self.faculty_booked_elsewhere),
+            "room_booked_elsewhere": booked_to_dict(self.room_booked_elsewhere),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Snapshot":
+        config = data.get("schedule_config")
+        return cls(
+            courses=[course_from_dict(d) for d in data.get("courses", [])],
+            faculty=[faculty_from_dict(d) for d in data.get("faculty", [])],
+            rooms=[room_from_dict(d) for d in data.get("rooms", [])],
+            batches=[batch_from_dict(d) for d in data.get("batches", [])],
+            sections=[section_from_dict(d) for d in data.get("sections", [])],
+            schedule_config=schedule_config_from_dict(config) if config else None,
+            elective_choices=[list(c) for c in data.get("elective_choices", [])],
+            faculty_base_load={fid: int(n) for fid, n in (data.get("faculty_base_load") or {}).items()},
+            faculty_booked_elsewhere=booked_from_dict(data.get("faculty_booked_elsewhere")),
+            room_booked_elsewhere=booked_from_dict(data.get("room_booked_elsewhere")),
+            meta=data.get("meta") or {},
+        )
+
+    def generator_kwargs(self) -> dict:
+        """Keyword arguments for ``TimetableGenerator`` mirroring the generate endpoint."""
+        config = self.schedule_config
+        return {
+            "courses": self.courses,
+            "faculty": self.faculty,
+            "rooms": self.rooms,
+            "batches": self.batches,
+            "sections": self.sections or None,
+            "periods_per_day": config.periods_per_day if config else 8,
+            "working_days": config.working_days if config else None,
+            "constraint_weights": config.constraint_weights if config else None,
+            "disabled_constraints": config.disabled_constraints if config else None,
+            "elective_clashes": ElectiveClashMatrix.from_choices(self.elective_choices),
+            "faculty_base_load": self.faculty_base_load,
+            "faculty_booked_elsewhere": self.faculty_booked_elsewhere,
+            "room_booked_elsewhere": self.room_booked_elsewhere,
+        }
+
+
+# ─── File I/O ─────────────────────────────────────────────────────
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in (".parquet", ".pq")
+
+
+def load_snapshot(path: str | Path) -> Snapshot:
+    path = Path(path)
+    if _is_parquet(path):
+        import pandas as pd
+
+        df = pd.read_parquet(path)
+        data: Dict[str, Any] = {name: [] for name in COLLECTIONS}
+        data.update({name: None for name in SINGLE_RECORDS})
+        for collection, document in zip(df["collection"], df["document"]):
+            record = json.loads(document)
+            if collection in SINGLE_RECORDS:
+                data[collection] = record
+            elif collection == "meta":
+                data["meta"] = record
+            else:
+                data.setdefault(collection, []).append(record)
+        return Snapshot.from_dict(data)
+
+    with open(path, "r", encoding="utf-8") as fh:
+        return Snapshot.from_dict(json.load(fh))
+
+
+def save_snapshot(snapshot: Snapshot, path: str | Path) -> None:
+    path = Path(path)
+    data = snapshot.to_dict()
+    if _is_parquet(path):
+        import pandas as pd
+
+        rows = [{"collection": "meta", "document": json.dumps({**data["meta"], "version": data["version"]})}]
+        for name in COLLECTIONS:
+            value = data.get(name)
+            if value is None:
+                continue
+            records = value if isinstance(value, list) else [value]
+            rows.extend({"collection": name, "document": json.dumps(r)} for r in records)
+        pd.DataFrame(rows, columns=["collection", "document"]).to_parquet(path, index=False)
+        return
+
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2)
+
+
+async def export_snapshot(
+    program_id: str | None = None,
+    batch_id: str | None = None,
+    semester_id: str | None = None,
+    section_ids: List[str] | None = None,
+) -> Snapshot:
+    """
+    Dump a snapshot from the live database (``init_db`` must have run).
+    With program/batch/semester ids, mirrors the data loaded by ``POST /timetables/generate``;
+    without them, every course, batch and section is exported.
+    """
+    course_filter: Dict[str, Any] = {}
+    if program_id:
+        course_filter["program.$id"] = PydanticObjectId(program_id)
+    if semester_id:
+        course_filter["semester.$id"] = PydanticObjectId(semester_id)
+    courses = await Course.find(course_filter).to_list()
+    faculty = await Faculty.find_all().to_list()
+    rooms = await Room.find_all().to_list()
+
+    if batch_id:
+        batch = await Batch.get(PydanticObjectId(batch_id))
+        batches = [batch] if batch else []
+    else:
+        batches = await Batch.find_all().to_list()
+
+    if section_ids:
+        wanted = section_ids
+    else:
+        wanted = [sid for b in batches for sid in (extract_link_id(s) for s in (b.sections or [])) if sid]
+    sections = await Section.find({"_id": {"$in": [PydanticObjectId(s) for s in wanted]}}).to_list() if wanted else []
+
+    schedule_config = None
+    if semester_id:
+        schedule_config = await ScheduleConfig.find_one({"semester.$id": PydanticObjectId(semester_id)})
+
+    choices = [c async for c in elective_choices(PydanticObjectId(batch_id) if batch_id else None)]
+
+    # What the rest of the institution already takes up. For a batch and
+    # semester these are the timetables a generate run would keep, as in
+    # ``POST /timetables/generate``; otherwise every saved timetable.
+    superseded: List[PydanticObjectId] = []
+    if batch_id and semester_id:
+        superseded_query: Dict[str, Any] = {
+            "batch.$id": PydanticObjectId(batch_id),
+            "semester.$id": PydanticObjectId(semester_id),
+        }
+        if sections:
+            superseded_query["section.$id"] = {"$in": [s.id for s in sections]}
+        else:
+            superseded_query["section"] = None
+        superseded = [v.id for v in await Timetable.find(superseded_query).project(VersionView).to_list()]
+    own_timetables = [str(tid) for tid in superseded]
+    if not occupancy.loaded:
+        await occupancy.load()
+
+    return Snapshot(
+        courses=courses,
+        faculty=faculty,
+        rooms=rooms,
+        batches=batches,
+        sections=sections,
+        schedule_config=schedule_config,
+        elective_choices=choices,
+        faculty_base_load=await faculty_load_hours({"_id": {"$nin": superseded}}),
+        faculty_booked_elsewhere=occupancy.busy_map(FACULTY, own_timetables),
+        room_booked_elsewhere=occupancy.busy_map(ROOM, own_timetables),
+        meta={"program_id": program_id, "batch_id": batch_id, "semester_id": semester_id},
+    )
@@ -0,0 +1,63 @@
+"""
+Collection-level version counters for conditional GETs.
+
+Every write made through the API calls ``record_write(*collections)``. That
+bumps a counter per collection in the small ``collection_versions``
+collection, stamps the time of the change and drops the local cached copy.
+A list endpoint then builds its ETag from the counters of the collections
+its response is made of. Checking ``If-None-Match`` costs one indexed read
+of a few tiny documents, whatever the size of the listing.
+
+The counters are shared by all workers. Reading them also invalidates any
+reference-data cache that another worker's write has made stale
+(``ReferenceData.observe``), so a fresh ETag never comes with an old body.
+
+Writes made outside the API (scripts, the Mongo shell) must call
+``record_write`` too, or clients may keep an outdated copy.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.models.programs import Program
+from app.services.refdata import reference_data
+
+VERSIONS_COLLECTION = "collection_versions"
+
+
+def _collection():
+    return Program.get_pymongo_collection().database[VERSIONS_COLLECTION]
+
+
+async def current(names: Iterable[str]) -> Tuple[Dict[str, int], Optional[datetime]]:
+    """Version per collection (0 if never written) and the latest change time."""
+    names = list(names)
+    versions = {name: 0 for name in names}
+    changed_at: Optional[datetime] = None
+    async for doc in _collection().find({"_id": {"$in": names}}):
+        versions[doc["_id"]] = doc.get("version", 0)
+        stamp = doc.get("updated_at")
+        if stamp is not None:
+            stamp = stamp.replace(tzinfo=timezone.utc) if stamp.tzinfo is None else stamp
+            changed_at = stamp if changed_at is None or stamp > changed_at else changed_at
+    reference_data.observe(versions)
+    return versions, changed_at
+
+
+async def record_write(*names: str) -> None:
+    """Mark collections as changed: bump their versions and drop local cached copies."""
+    if not names:
+        return
+    cached = [name for name in names if name in reference_data.caches()]
+    if cached:
+        reference_data.invalidate(*cached)
+    await _collection().bulk_write([
+        UpdateOne(
+            {"_id": name},
+            {"$inc": {"version": 1}, "$currentDate": {"updated_at": True}},
+            upsert=True,
+        )
+        for name in names
+    ], ordered=False)
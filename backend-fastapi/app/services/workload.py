@@ -0,0 +1,50 @@
+"""
+Faculty workload bookkeeping.
+
+Load is counted in periods taught across saved timetables (one period is one
+load hour, matching the default 60-minute schedule).
+"""
+
+from typing import Any, Dict, Optional
+
+from beanie import BulkWriter, PydanticObjectId
+from beanie.operators import NotIn
+
+from app.models.faculty import Faculty
+from app.models.timetable import Timetable
+from app.services.versions import record_write
+
+
+async def faculty_load_hours(match: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """Periods assigned per faculty id across timetables matching ``match``."""
+    pipeline = []
+    if match:
+        pipeline.append({"$match": match})
+    pipeline += [
+        {"$unwind": "$entries"},
+        {"$group": {"_id": "$entries.faculty_id", "periods": {"$sum": 1}}},
+    ]
+    rows = await Timetable.aggregate(pipeline).to_list()
+    return {str(r["_id"]): int(r["periods"]) for r in rows if r.get("_id")}
+
+
+async def refresh_faculty_load() -> Dict[str, int]:
+    """Recompute ``Faculty.current_load_hours`` from all timetables in one bulk write."""
+    loads = await faculty_load_hours()
+    ids = []
+    async with BulkWriter() as bulk_writer:
+        for fid, periods in loads.items():
+            try:
+                oid = PydanticObjectId(fid)
+            except Exception:
+                continue
+            ids.append(oid)
+            # Only documents whose load changed are written (and re-versioned)
+            await Faculty.find({"_id": oid, "current_load_hours": {"$ne": periods}}).update(
+                {"$set": {"current_load_hours": periods}, "$inc": {"version": 1}}, bulk_writer=bulk_writer
+            )
+        await Faculty.find(NotIn(Faculty.id, ids), {"current_load_hours": {"$ne": 0}}).update(
+            {"$set": {"current_load_hours": 0}, "$inc": {"version": 1}}, bulk_writer=bulk_writer
+        )
+    await record_write("faculty")
+    return loads
@@ -1,15 +1,30 @@
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.security import PasswordHashingBusy
 from app.db.init_db import init_db
+from app.services.change_feed import change_feed
+from app.services.occupancy import occupancy
+from app.services.refdata import reference_data
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await init_db()
+    database = await init_db()
+    await occupancy.load()
+    await reference_data.warm()
+    watcher = asyncio.create_task(change_feed.run(database)) if settings.CHANGE_STREAMS_ENABLED else None
     yield
     # Shutdown
+    if watcher:
+        watcher.cancel()
+        try:
+            await watcher
+        except asyncio.CancelledError:
+            pass
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -24,8 +39,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "Last-Modified"],
 )
 
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy(request: Request, exc: PasswordHashingBusy):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 from app.api.v1.api import api_router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -241,7 +241,7 @@ export default function TimetableListView({
                 </div>
                 <div className="mt-3 flex items-center justify-between text-sm">
                   <span className="text-muted-foreground">
-                    {t.entries?.length || 0} entries
+                    {t.entry_count ?? t.entries?.length ?? 0} entries
                   </span>
                   <div className="flex gap-1">
                     <Button
@@ -32,6 +32,18 @@ apiClient.interceptors.response.use(
   }
 );
 
+// Follow X-Next-Cursor until every page of a keyset-paginated list is loaded
+const getAllPages = async (url: string, params: Record<string, unknown> = {}) => {
+  const items: any[] = [];
+  let cursor: string | undefined;
+  do {
+    const res = await apiClient.get(url, { params: { ...params, limit: 500, cursor } });
+    items.push(...res.data);
+    cursor = res.headers["x-next-cursor"];
+  } while (cursor);
+  return items;
+};
+
 // ─── Auth ───
 export const loginUser = async (email: string, password: string) => {
   const { data } = await apiClient.post("/login", { email, password });
@@ -106,9 +118,8 @@ export const deleteSection = async (programId: string, batchId: string, sectionI
 };
 
 // ─── Courses ───
-export const getCourses = async () => {
-  const { data } = await apiClient.get("/courses/");
-  return data;
+export const getCourses = async (filters: Record<string, unknown> = {}) => {
+  return getAllPages("/courses/", filters);
 };
 
 export const createCourse = async (course: {
@@ -126,9 +137,8 @@ export const deleteCourse = async (id: string) => {
 };
 
 // ─── Faculty ───
-export const getFaculty = async () => {
-  const { data } = await apiClient.get("/faculty/");
-  return data;
+export const getFaculty = async (filters: Record<string, unknown> = {}) => {
+  return getAllPages("/faculty/", filters);
 };
 
 export const createFaculty = async (faculty: {
@@ -150,12 +160,17 @@ export const getMyTimetable = async () => {
   return data;
 };
 
-// ─── Infrastructure (Rooms) ───
-export const getRooms = async () => {
-  const { data } = await apiClient.get("/infrastructure/");
+// ─── Search ───
+export const searchEntities = async (q: string, types: string[] = [], limit = 10) => {
+  const { data } = await apiClient.get("/search/", { params: { q, types, limit }, paramsSerializer: { indexes: null } });
   return data;
 };
 
+// ─── Infrastructure (Rooms) ───
+export const getRooms = async (filters: Record<string, unknown> = {}) => {
+  return getAllPages("/infrastructure/", filters);
+};
+
 export const createRoom = async (room: { name: string; capacity: number; type?: string; features?: string[] }) => {
   const { data } = await apiClient.post("/infrastructure/", room);
   return data;
@@ -167,9 +182,9 @@ export const deleteRoom = async (id: string) => {
 };
 
 // ─── Timetables ───
-export const getTimetables = async () => {
-  const { data } = await apiClient.get("/timetables/");
-  return data;
+// Summaries only (no entries; see entry_count) — fetch one with getTimetable for its entries
+export const getTimetables = async (filters: Record<string, unknown> = {}) => {
+  return getAllPages("/timetables/", { fields: "summary", ...filters });
 };
 
 export const getTimetable = async (id: string) => {